@@ -3,12 +3,42 @@ import os
 import sys
 import json
 import time
+import copy
+import re
+import hashlib
+import logging
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from io import BytesIO
 from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Optional accelerators / document parsers; a missing parser yields no text for that format
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+try:
+    import docx
+except ImportError:
+    docx = None
+try:
+    from rank_bm25 import BM25Okapi
+except ImportError:
+    BM25Okapi = None
+
+logger = logging.getLogger(__name__)
 
 # Ensure a working sqlite3 for ChromaDB on managed platforms (e.g., Streamlit Cloud)
 try:
@@ -23,28 +53,58 @@ except Exception:
 # Add the project root to Python path and load environment
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
-# Load environment variables from .env in this folder; if not found, also try parent project root
-loaded = load_dotenv(dotenv_path=project_root / ".env", override=True)
-if not loaded:
-    load_dotenv(dotenv_path=project_root.parent / ".env", override=True)
+
+@st.cache_resource(show_spinner=False)
+def _load_env():
+    """Load .env from this folder, else the parent project root, once per process.
+
+    This script re-executes on every rerun, so a plain module-level call (or
+    functools.cache) would stat and parse the file each time.
+    """
+    loaded = load_dotenv(dotenv_path=os.fspath(project_root / ".env"), override=True)
+    return loaded or load_dotenv(dotenv_path=os.fspath(project_root.parent / ".env"), override=True)
+
+_load_env()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-# Import RAG components
-try:
-    from rag_engine.multilingual_rag import MultilingualRAGEngine
-    from rag_engine.adaptive_rag import AdaptiveRAGEngine
-    from rag_engine.reflective_rag import SelfReflectiveRAG
-    from rag_engine.memory_rag import MemoryAugmentedRAG
-    from rag_engine.hybrid_search import HybridSearchEngine
-    from features.voice_processing import VoiceProcessor
-    from features.progress_tracking import ProgressTracker
-    from features.smart_learning_paths import SmartLearningPaths
-    from features.advanced_analytics import AdvancedAnalytics
-    from features.gamification import GamificationEngine
-    RAG_AVAILABLE = True
-except ImportError as e:
-    st.warning(f"Some RAG components not available: {e}")
-    RAG_AVAILABLE = False
+# RAG components are imported lazily (see _lazy_rag_imports) so the public
+# landing page never pays for transformers/chromadb/langchain on cold start.
+RAG_AVAILABLE = None
+_RAG_CLASSES = {}
+
+def _lazy_rag_imports():
+    """Import RAG engines and feature modules on first use; returns availability"""
+    global RAG_AVAILABLE
+    if RAG_AVAILABLE is not None:
+        return RAG_AVAILABLE
+    try:
+        from rag_engine.multilingual_rag import MultilingualRAGEngine
+        from rag_engine.adaptive_rag import AdaptiveRAGEngine
+        from rag_engine.reflective_rag import SelfReflectiveRAG
+        from rag_engine.memory_rag import MemoryAugmentedRAG
+        from rag_engine.hybrid_search import HybridSearchEngine
+        from features.voice_processing import VoiceProcessor
+        from features.progress_tracking import ProgressTracker
+        from features.smart_learning_paths import SmartLearningPaths
+        from features.advanced_analytics import AdvancedAnalytics
+        from features.gamification import GamificationEngine
+        _RAG_CLASSES.update({
+            "multilingual_rag": MultilingualRAGEngine,
+            "adaptive_rag": AdaptiveRAGEngine,
+            "self_reflective_rag": SelfReflectiveRAG,
+            "memory_rag": MemoryAugmentedRAG,
+            "hybrid_search": HybridSearchEngine,
+            "voice_processor": VoiceProcessor,
+            "progress_tracker": ProgressTracker,
+            "smart_learning_paths": SmartLearningPaths,
+            "advanced_analytics": AdvancedAnalytics,
+            "gamification_engine": GamificationEngine,
+        })
+        RAG_AVAILABLE = True
+    except ImportError as e:
+        st.warning(f"Some RAG components not available: {e}")
+        RAG_AVAILABLE = False
+    return RAG_AVAILABLE
 
 # Page configuration
 st.set_page_config(
@@ -55,7 +115,7 @@ st.set_page_config(
 )
 
 # Hide Streamlit default elements and add custom styling
-st.markdown("""
+_CSS = """
 <style>
     /* Hide Streamlit default elements */
     #MainMenu {visibility: hidden;}
@@ -72,23 +132,11 @@ st.markdown("""
         max-width: 100%;
     }
     
-    .stApp {
-        background: #f8f9fa;
-    }
-    
     /* Fix text visibility */
-    .stMarkdown {
-        color: #2c3e50 !important;
-    }
-    
     .stMarkdown h1, .stMarkdown h2, .stMarkdown h3, .stMarkdown h4, .stMarkdown h5, .stMarkdown h6 {
         color: #2c3e50 !important;
     }
     
-    .stMarkdown p {
-        color: #495057 !important;
-    }
-    
     .stMarkdown strong {
         color: #2c3e50 !important;
     }
@@ -103,34 +151,43 @@ st.markdown("""
         padding: 1rem 0;
         position: fixed;
         top: 0;
-        width: 100%;
+        left: 0;
+        right: 0;
+        width: 100vw;
+        box-sizing: border-box;
         z-index: 1000;
         box-shadow: 0 2px 10px rgba(0,0,0,0.1);
     }
     
     .nav-container {
-        max-width: 100%;
-        margin: 0 auto;
+        width: 100% !important;
+        max-width: 100% !important;
+        margin: 0 !important;
         display: flex;
         justify-content: space-between;
         align-items: center;
-        padding: 0 1rem;
+        padding-left: 0 !important;
+        padding-right: 0 !important;
         gap: 1rem;
         flex-wrap: wrap;
+        overflow-x: auto;
+        white-space: nowrap;
     }
 
-    .nav-left { display: flex; align-items: center; gap: 1.5rem; }
+    .nav-left { display: flex; align-items: center; gap: 1.5rem; flex-wrap: nowrap; }
     
     .nav-logo {
+        display: inline-block;
         font-size: 1.8rem;
         font-weight: 800;
         color: white;
         text-decoration: none;
     }
     
-    .nav-links { display: flex; gap: 1.25rem; align-items: center; white-space: nowrap; }
+    .nav-links { display: flex; gap: 1rem !important; align-items: center; white-space: nowrap; flex-wrap: nowrap; }
     
     .nav-link {
+        display: inline-block;
         color: white;
         text-decoration: none !important;
         font-weight: 500;
@@ -145,12 +202,13 @@ st.markdown("""
         text-decoration: none !important;
     }
     
-    .nav-buttons { display: flex; gap: 0.5rem; white-space: nowrap; }
+    .nav-buttons { display: flex; gap: 0.5rem !important; white-space: nowrap; flex-wrap: nowrap; }
     
     .btn-primary {
+        display: inline-block;
         background: white;
         color: #667eea;
-        padding: 0.5rem 1.5rem;
+        padding: 0.4rem 1rem !important;
         border-radius: 25px;
         text-decoration: none !important;
         font-weight: 600;
@@ -167,9 +225,10 @@ st.markdown("""
     }
     
     .btn-secondary {
+        display: inline-block;
         background: transparent;
         color: white;
-        padding: 0.5rem 1.5rem;
+        padding: 0.4rem 1rem !important;
         border: 2px solid white;
         border-radius: 25px;
         text-decoration: none !important;
@@ -188,10 +247,10 @@ st.markdown("""
     /* Hero Section */
     .hero {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 4rem 0 2rem 0;
+        padding: 2rem 0 1rem 0 !important;
         text-align: center;
         color: white;
-        margin-top: 60px;
+        margin-top: 40px !important;
     }
     
     .hero-content {
@@ -282,19 +341,19 @@ st.markdown("""
     
     /* Section Styles */
     .section {
-        padding: 4rem 0;
+        padding: 2.5rem 0 !important;
         background: white;
     }
     
     .container {
-        max-width: 1200px;
-        margin: 0 auto;
-        padding: 0 2rem;
+        max-width: 100% !important;
+        margin: 0 !important;
+        padding: 0 !important;
     }
     
     .section-title {
         font-size: 2.5rem;
-        font-weight: 700;
+        font-weight: 800;
         text-align: center;
         margin-bottom: 1rem;
         color: #2c3e50;
@@ -304,14 +363,22 @@ st.markdown("""
         font-size: 1.2rem;
         text-align: center;
         margin-bottom: 3rem;
-        color: #6c757d;
+        color: #7f8c8d;
         max-width: 600px;
         margin-left: auto;
         margin-right: auto;
     }
     
+    .section-dark {
+        background: #f8f9fa;
+    }
+    
     /* About Section */
     .about-content {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 3rem;
+        align-items: center;
         text-align: left !important;
         max-width: 100% !important;
         margin: 0 !important;
@@ -325,15 +392,24 @@ st.markdown("""
         margin-bottom: 3rem;
     }
     
+    .about-text {
+        font-size: 1.1rem;
+        line-height: 1.8;
+        color: #495057;
+    }
+    
     .about-stats {
-        display: flex;
+        display: grid;
+        grid-template-columns: repeat(2, 1fr);
         justify-content: center;
-        gap: 3rem;
-        flex-wrap: wrap;
+        gap: 2rem;
     }
     
     .stat-item {
         text-align: center;
+        padding: 1.5rem;
+        background: #f8f9fa;
+        border-radius: 10px;
     }
     
     .stat-item h3 {
@@ -349,6 +425,18 @@ st.markdown("""
         margin: 0;
     }
     
+    .stat-number {
+        font-size: 2.5rem;
+        font-weight: 800;
+        color: #667eea;
+        margin-bottom: 0.5rem;
+    }
+    
+    .stat-label {
+        color: #6c757d;
+        font-weight: 500;
+    }
+    
     /* Features Section */
     .features-section {
         background: #f8f9fa;
@@ -361,24 +449,32 @@ st.markdown("""
         margin-top: 3rem;
     }
     
+    .feature-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+        gap: 2rem;
+        margin: 3rem 0;
+    }
+    
     .feature-card {
         background: white;
         padding: 2rem;
         border-radius: 15px;
-        box-shadow: 0 5px 15px rgba(0,0,0,0.08);
+        box-shadow: 0 5px 20px rgba(0,0,0,0.1);
         text-align: center;
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
+        transition: all 0.3s ease;
         border: 1px solid #e9ecef;
     }
     
     .feature-card:hover {
         transform: translateY(-5px);
-        box-shadow: 0 15px 35px rgba(0,0,0,0.15);
+        box-shadow: 0 10px 30px rgba(0,0,0,0.15);
     }
     
     .feature-icon {
         font-size: 3rem;
-        margin-bottom: 1.5rem;
+        margin-bottom: 1rem;
+        display: block;
     }
     
     .feature-card h3 {
@@ -394,6 +490,19 @@ st.markdown("""
         margin: 0;
     }
     
+    .feature-title {
+        font-size: 1.5rem;
+        font-weight: 700;
+        margin-bottom: 1rem;
+        color: #2c3e50;
+    }
+    
+    .feature-description {
+        color: #6c757d;
+        line-height: 1.6;
+        font-size: 1rem;
+    }
+    
     /* Contact Section */
     .contact-section {
         background: #f8f9fa;
@@ -406,6 +515,19 @@ st.markdown("""
         margin-top: 3rem;
     }
     
+    .contact-grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 3rem;
+        margin: 3rem 0;
+    }
+    
+    .contact-info {
+        background: #f8f9fa;
+        padding: 2rem;
+        border-radius: 15px;
+    }
+    
     .contact-info h3,
     .contact-message h3 {
         font-size: 1.5rem;
@@ -455,152 +577,11 @@ st.markdown("""
         color: #667eea;
     }
     
-    .section-dark {
-        background: #f8f9fa;
-    }
-    
-    .container {
-        max-width: 1200px;
-        margin: 0 auto;
-        padding: 0 2rem;
-    }
-    
-    .section-title {
-        font-size: 2.5rem;
-        font-weight: 800;
-        text-align: center;
-        margin-bottom: 1rem;
-        color: #2c3e50;
-    }
-    
-    .section-subtitle {
-        font-size: 1.2rem;
-        text-align: center;
-        margin-bottom: 3rem;
-        color: #7f8c8d;
-        max-width: 600px;
-        margin-left: auto;
-        margin-right: auto;
-    }
-    
-    /* Feature Grid */
-    .feature-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-        gap: 2rem;
-        margin: 3rem 0;
-    }
-    
-    .feature-card {
-        background: white;
-        padding: 2rem;
-        border-radius: 15px;
-        box-shadow: 0 5px 20px rgba(0,0,0,0.1);
-        text-align: center;
-        transition: all 0.3s ease;
-        border: 1px solid #e9ecef;
-    }
-    
-    .feature-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 10px 30px rgba(0,0,0,0.15);
-    }
-    
-    .feature-icon {
-        font-size: 3rem;
-        margin-bottom: 1rem;
-        display: block;
-    }
-    
-    .feature-title {
-        font-size: 1.5rem;
-        font-weight: 700;
-        margin-bottom: 1rem;
-        color: #2c3e50;
-    }
-    
-    .feature-description {
-        color: #6c757d;
-        line-height: 1.6;
-        font-size: 1rem;
-    }
-    
-    /* About Section */
-    .about-content {
-        display: grid;
-        grid-template-columns: 1fr 1fr;
-        gap: 3rem;
-        align-items: center;
-        margin: 3rem 0;
-    }
-    
-    .about-text {
-        font-size: 1.1rem;
-        line-height: 1.8;
-        color: #495057;
-    }
-    
-    .about-stats {
-        display: grid;
-        grid-template-columns: repeat(2, 1fr);
-        gap: 2rem;
-    }
-    
-    .stat-item {
-        text-align: center;
-        padding: 1.5rem;
-        background: #f8f9fa;
-        border-radius: 10px;
-    }
-    
-    .stat-number {
-        font-size: 2.5rem;
-        font-weight: 800;
-        color: #667eea;
-        margin-bottom: 0.5rem;
-    }
-    
-    .stat-label {
-        color: #6c757d;
-        font-weight: 500;
-    }
-    
-    /* Contact Section */
-    .contact-grid {
-        display: grid;
-        grid-template-columns: 1fr 1fr;
-        gap: 3rem;
-        margin: 3rem 0;
-    }
-    
-    .contact-info {
-        background: #f8f9fa;
-        padding: 2rem;
-        border-radius: 15px;
-    }
-    
-    .contact-item {
-        display: flex;
-        align-items: center;
-        margin-bottom: 1.5rem;
-    }
-    
-    .contact-icon {
-        font-size: 1.5rem;
-        margin-right: 1rem;
-        color: #667eea;
-    }
-    
-    .contact-text {
-        color: #495057;
-        font-size: 1.1rem;
-    }
-    
     /* Footer */
     .footer {
         background: #111111 !important; /* ensure dark background */
         color: #ffffff !important;      /* ensure light text */
-        padding: 0 !important;
+        padding: 0.75rem 0 !important;
         text-align: left !important;
         width: 100vw !important;
         margin: 0 !important;
@@ -617,7 +598,7 @@ st.markdown("""
     .footer-content {
         max-width: 100% !important;
         margin: 0 !important;
-        padding: 0.25rem 0.75rem !important;
+        padding: 0 0.5rem !important;
     }
     
     .footer-title {
@@ -640,18 +621,16 @@ st.markdown("""
         margin: 0.25rem 0.75rem !important;
         flex-wrap: wrap;
     }
-    .footer-link { color: #ecf0f1 !important; }
-    .footer-link:hover { color: #667eea !important; }
     
     .footer-link {
-        color: white;
+        color: #ecf0f1 !important;
         text-decoration: none !important;
         font-weight: 500;
         transition: all 0.3s ease;
     }
     
     .footer-link:hover {
-        color: #667eea;
+        color: #667eea !important;
         text-decoration: none !important;
     }
     
@@ -708,7 +687,8 @@ st.markdown("""
     }
     
     .upload-section {
-        background: #f8f9fa;
+        background: #ffffff !important;
+        color: #333333 !important;
         padding: 1.5rem;
         border-radius: 10px;
         margin-bottom: 2rem;
@@ -733,6 +713,12 @@ st.markdown("""
         font-size: 1rem;
         width: 100%;
     }
+    
+    .stButton > button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
+    }
+    
     /* Text fields and chat input colors (force light background + dark text) */
     input, textarea, select { background: #ffffff !important; color: #111111 !important; caret-color: #111111 !important; }
     input[type="text"], input[type="search"], input[type="number"], input[type="email"], input[type="password"],
@@ -749,12 +735,6 @@ st.markdown("""
     /* Chat input colors */
     [data-testid="stChatInput"] textarea { background: #ffffff !important; color: #333333 !important; }
     [data-testid="stChatInput"] button { background: #ffffff !important; color: #333333 !important; border: 1px solid #ced4da !important; }
-    .upload-section { background: #ffffff !important; color: #333333 !important; }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
-    }
     
     /* Responsive Design */
     @media (max-width: 768px) {
@@ -774,18 +754,13 @@ st.markdown("""
         .contact-grid {
             grid-template-columns: 1fr;
         }
-        
-        .nav-links {
-            display: none;
-        }
     }
 
-    /* Spacing overrides to ensure tighter layout */
-    .hero { padding: 2rem 0 1rem 0 !important; margin-top: 40px !important; }
-    .footer { padding: 0.75rem 0 !important; }
-    .footer-content { max-width: 100% !important; padding: 0 0.5rem !important; }
-    .footer-links { gap: 1rem !important; }
-    .section { padding: 2.5rem 0 !important; }
+    @media (max-width: 992px) {
+        .nav-links { display: none !important; }
+        .btn-primary, .btn-secondary { padding: 0.4rem 0.8rem !important; }
+    }
+
     /* Make anchors scroll nicely below fixed navbar */
     html { scroll-behavior: smooth; }
     .section, .hero { scroll-margin-top: 90px; }
@@ -799,12 +774,6 @@ st.markdown("""
     p, li, span, div {
         color: #111111 !important;
     }
-    /* Do not override footer contrast */
-    .footer, .footer * {
-        color: #ffffff !important;
-        -webkit-text-fill-color: #ffffff !important;
-        opacity: 1 !important;
-    }
     h1, h2, h3, h4, h5, h6 { color: #2c3e50 !important; }
     a { color: #2c3e50 !important; text-decoration: none !important; }
     a:hover { color: #667eea !important; text-decoration: none !important; }
@@ -817,132 +786,40 @@ st.markdown("""
     [data-testid="stHeader"] { display: none !important; }
     [data-testid="stToolbar"] { display: none !important; }
     [data-testid="block-container"], .main .block-container { margin: 0 !important; padding-left: 0 !important; padding-right: 0 !important; max-width: 100% !important; }
-    .container { max-width: 100% !important; padding-left: 0 !important; padding-right: 0 !important; margin: 0 !important; }
-    .nav-container { max-width: 100% !important; padding-left: 0 !important; padding-right: 0 !important; margin: 0 !important; }
     :root { --st-edge-padding: 0px !important; }
-
-    /* Hard overrides to eliminate left offset and avoid wrapping */
     *, *::before, *::after { box-sizing: border-box !important; }
-    .navbar { left: 0; right: 0; width: 100vw; box-sizing: border-box; }
-    .nav-container { width: 100% !important; overflow-x: auto; white-space: nowrap; }
-    .nav-left { flex-wrap: nowrap; }
-    .nav-links { flex-wrap: nowrap; }
-    .nav-buttons { flex-wrap: nowrap; }
-    .nav-logo { display: inline-block; }
-    .nav-link, .btn-primary, .btn-secondary { display: inline-block; }
-    .nav-links { gap: 0.9rem !important; }
-    .nav-buttons { gap: 0.5rem !important; }
-
-    /* Prevent nav wrapping and compress spacing */
-    .nav-links { gap: 1rem !important; }
-    .nav-buttons { gap: 0.5rem !important; }
-    .btn-primary, .btn-secondary { padding: 0.4rem 1rem !important; }
-
-    @media (max-width: 992px) {
-        .nav-links { display: none !important; }
-        .nav-buttons { gap: 0.5rem !important; }
-        .btn-primary, .btn-secondary { padding: 0.4rem 0.8rem !important; }
-    }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-class YenetaApp:
-    def __init__(self):
-        self.initialize_session_state()
-        if RAG_AVAILABLE:
-            self.setup_rag_engines()
-    
-    def _extract_text_from_bytes(self, data: bytes, filename: str) -> str:
-        """Best-effort text extraction from common doc types for local context building."""
-        name_lower = filename.lower()
-        # PDF
-        if name_lower.endswith('.pdf'):
-            try:
-                from io import BytesIO
-                from pypdf import PdfReader
-                reader = PdfReader(BytesIO(data))
-                texts = []
-                for page in reader.pages[:10]:
-                    texts.append(page.extract_text() or "")
-                return "\n".join(texts)
-            except Exception:
-                return ""
-        # DOCX
-        if name_lower.endswith('.docx'):
-            try:
-                from io import BytesIO
-                import docx
-                doc = docx.Document(BytesIO(data))
-                return "\n".join(p.text for p in doc.paragraphs)
-            except Exception:
-                return ""
-        # Markdown / Text
-        try:
-            return data.decode('utf-8', errors='ignore')
-        except Exception:
-            return ""
-    
-    def initialize_session_state(self):
-        """Initialize session state variables"""
-        if "authenticated" not in st.session_state:
-            st.session_state.authenticated = False
-        if "user" not in st.session_state:
-            st.session_state.user = None
-        if "current_page" not in st.session_state:
-            st.session_state.current_page = "Home"
-        if "show_public" not in st.session_state:
-            st.session_state.show_public = False
-        if "messages" not in st.session_state:
-            st.session_state.messages = []
-        if "message_subjects" not in st.session_state:
-            st.session_state.message_subjects = {}
-        if "rag_engines_initialized" not in st.session_state:
-            st.session_state.rag_engines_initialized = False
-        if "uploaded_files" not in st.session_state:
-            st.session_state.uploaded_files = []
-        if "file_summaries" not in st.session_state:
-            st.session_state.file_summaries = {}
-        if "study_plans" not in st.session_state:
-            st.session_state.study_plans = {}
-        if "quizzes" not in st.session_state:
-            st.session_state.quizzes = {}
-        if "user_profile" not in st.session_state:
-            st.session_state.user_profile = {
-                "name": "Student",
-                "email": "student@yeneta.com",
-                "language_preference": "English",
-                "learning_level": "Beginner"
-            }
-    
-    def setup_rag_engines(self):
-        """Initialize all RAG engines"""
-        if not st.session_state.get('rag_engines_initialized', False):
-            try:
-                if not GROQ_API_KEY:
-                    st.warning("⚠️ GROQ_API_KEY not found. AI responses may be limited.")
-                
-                self.multilingual_rag = MultilingualRAGEngine()
-                self.adaptive_rag = AdaptiveRAGEngine()
-                self.self_reflective_rag = SelfReflectiveRAG()
-                self.memory_rag = MemoryAugmentedRAG()
-                self.hybrid_search = HybridSearchEngine()
-                
-                self.voice_processor = VoiceProcessor()
-                self.progress_tracker = ProgressTracker()
-                self.smart_learning_paths = SmartLearningPaths()
-                self.advanced_analytics = AdvancedAnalytics()
-                self.gamification_engine = GamificationEngine()
-                
-                st.session_state.rag_engines_initialized = True
-                
-            except Exception as e:
-                st.error(f"❌ Error initializing RAG engines: {e}")
-                st.session_state.rag_engines_initialized = False
+# In-page smooth scroll for header/footer anchors without reload; the flag keeps
+# reruns from stacking duplicate click listeners on the document
+_SCROLL_JS = """
+<script>
+if (!window.__yenetaScrollBound) {
+  window.__yenetaScrollBound = true;
+  document.addEventListener('click', function(e){
+    const a = e.target.closest('a');
+    if (!a) return;
+    const href = a.getAttribute('href') || '';
+    if (href.startsWith('#')) {
+      e.preventDefault();
+      const target = document.querySelector(href);
+      if (target) { target.scrollIntoView({ behavior: 'smooth', block: 'start' }); }
+    }
+  });
+}
+</script>
+"""
 
-    def render_navigation(self):
-        """Render the main navigation bar"""
-        # Visual header bar with inline nav next to logo
-        st.markdown("""
+def _inject_css():
+    """Emit the global stylesheet and scroll handler built once at import time.
+
+    Streamlit clears any element that is not re-emitted during a run, so this
+    must be called on every rerun; only the string construction is hoisted.
+    """
+    st.markdown(_CSS + _SCROLL_JS, unsafe_allow_html=True)
+
+_NAV_HTML = """
         <nav class="navbar">
             <div class="nav-container">
                 <div class="nav-left">
@@ -960,50 +837,10 @@ class YenetaApp:
                 </div>
             </div>
         </nav>
-        """, unsafe_allow_html=True)
-        
-        # In-page smooth scroll for header/footer anchors without reload
-        st.markdown(
-            """
-<script>
-document.addEventListener('click', function(e){
-  const a = e.target.closest('a');
-  if (!a) return;
-  const href = a.getAttribute('href') || '';
-  if (href.startsWith('#')) {
-    e.preventDefault();
-    const target = document.querySelector(href);
-    if (target) { target.scrollIntoView({ behavior: 'smooth', block: 'start' }); }
-  }
-});
-</script>
-            """,
-            unsafe_allow_html=True,
-        )
-        
-        # Smooth in-page scroll for header/footer links
-        st.markdown(
-            """
-<script>
-document.addEventListener('click', function(e){
-  const a = e.target.closest('a');
-  if(!a) return;
-  const href = a.getAttribute('href') || '';
-  if(href.startsWith('#')){
-    e.preventDefault();
-    const el = document.querySelector(href);
-    if(el){ el.scrollIntoView({ behavior: 'smooth', block: 'start' }); }
-  }
-});
-</script>
-            """,
-            unsafe_allow_html=True,
-        )
+        """
 
-    def render_hero_section(self):
-        """Render the hero section with Nelson Mandela quote"""
-        st.markdown(
-            """
+# Static landing-page sections; served through _static_html()
+_HERO_HTML = """
 <div id="hero" class="hero">
             <div class="hero-content">
                 <h1>🌍 Yeneta</h1>
@@ -1012,29 +849,9 @@ document.addEventListener('click', function(e){
 <div class="hero-quote">"Education is the most powerful weapon which you can use to change the world."<br><strong>- Nelson Mandela</strong></div>
                 </div>
             </div>
-            """,
-            unsafe_allow_html=True,
-        )
-        
-        # Hero buttons using Streamlit
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            st.markdown('<div class="hero-buttons">', unsafe_allow_html=True)
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("🚀 Join Now", key="hero_join_btn", help="Create your account", use_container_width=True):
-                    st.session_state.current_page = "Sign Up"
-                    st.rerun()
-            with col_btn2:
-                if st.button("🔑 Login", key="hero_login_btn", help="Sign in to your account", use_container_width=True):
-                    st.session_state.current_page = "Login"
-                    st.rerun()
-            st.markdown('</div>', unsafe_allow_html=True)
-
-    def render_about_section(self):
-        """Render the about us section"""
-        st.markdown(
             """
+
+_ABOUT_HTML = """
 <section id="about" class="section">
             <div class="container">
                 <h2 class="section-title">About Us</h2>
@@ -1048,58 +865,29 @@ document.addEventListener('click', function(e){
                         </div>
                         </div>
 </section>
-            """,
-            unsafe_allow_html=True,
-        )
-        
-        # Removed duplicated metrics to avoid repetition under About section
+            """
 
-    def render_features_section(self):
-        """Render the features section"""
-        st.markdown("""
+# (icon, title, description) per feature card
+_FEATURES = (
+    ("🌍", "Multilingual Support", "Native support for 6 African languages with cultural context awareness."),
+    ("🧠", "Advanced RAG Technology", "Cutting-edge retrieval with adaptive, self-reflective validation."),
+    ("🎯", "Adaptive Learning", "Adjusts explanations to your level based on your progress."),
+    ("🎤", "Voice Integration", "Speech-to-text and text-to-speech for inclusive learning."),
+    ("📊", "Progress Tracking", "Real-time analytics and personalized learning paths."),
+    ("🔍", "Self-Validation", "Ensures educational accuracy and appropriateness."),
+)
+
+_FEATURES_HTML = """
         <section id="features" class="section features-section">
             <div class="container">
                 <h2 class="section-title">🌟 Key Features</h2>
                 <p class="section-subtitle">Discover the powerful features that make Yeneta the ultimate learning platform</p>
-                <div class="features-grid">
-                    <article class="feature-card">
-                        <div class="feature-icon">🌍</div>
-                        <h3>Multilingual Support</h3>
-                        <p>Native support for 6 African languages with cultural context awareness.</p>
-                    </article>
-                    <article class="feature-card">
-                        <div class="feature-icon">🧠</div>
-                        <h3>Advanced RAG Technology</h3>
-                        <p>Cutting-edge retrieval with adaptive, self-reflective validation.</p>
-                    </article>
-                    <article class="feature-card">
-                        <div class="feature-icon">🎯</div>
-                        <h3>Adaptive Learning</h3>
-                        <p>Adjusts explanations to your level based on your progress.</p>
-                    </article>
-                    <article class="feature-card">
-                        <div class="feature-icon">🎤</div>
-                        <h3>Voice Integration</h3>
-                        <p>Speech-to-text and text-to-speech for inclusive learning.</p>
-                    </article>
-                    <article class="feature-card">
-                        <div class="feature-icon">📊</div>
-                        <h3>Progress Tracking</h3>
-                        <p>Real-time analytics and personalized learning paths.</p>
-                    </article>
-                    <article class="feature-card">
-                        <div class="feature-icon">🔍</div>
-                        <h3>Self-Validation</h3>
-                        <p>Ensures educational accuracy and appropriateness.</p>
-                    </article>
-                    </div>
-                </div>
+                <div class="features-grid">{cards}</div>
+            </div>
         </section>
-        """, unsafe_allow_html=True)
+        """
 
-    def render_contact_section(self):
-        """Render the contact section"""
-        st.markdown("""
+_CONTACT_HTML = """
         <section id="contact" class="section contact-section">
             <div class="container">
                 <h2 class="section-title">Contact Us</h2>
@@ -1123,11 +911,9 @@ document.addEventListener('click', function(e){
                 </div>
             </div>
         </section>
-        """, unsafe_allow_html=True)
+        """
 
-    def render_footer(self):
-        """Render the footer"""
-        st.markdown("""
+_FOOTER_HTML = """
         <div class="footer">
             <div class="footer-content">
                 <div class="footer-title">🌟 Yeneta - Empowering African Students Through AI</div>
@@ -1141,7 +927,396 @@ document.addEventListener('click', function(e){
                 <div class="footer-bottom">© 2024 Yeneta. All rights reserved. | Privacy Policy | Terms of Service</div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """
+
+_STATIC = {
+    "nav": _NAV_HTML,
+    "hero": _HERO_HTML,
+    "about": _ABOUT_HTML,
+    "features": _FEATURES_HTML,
+    "contact": _CONTACT_HTML,
+    "footer": _FOOTER_HTML,
+}
+
+
+@st.cache_resource(show_spinner=False)
+def _static_html():
+    """Return the dedented landing-page sections, built once per server process.
+
+    Streamlit re-executes this script on every rerun, so the dedent/join work
+    is cached here rather than done at module level. Each section is dedented
+    on its own (as st.markdown would) so they can be concatenated without
+    indented lines turning into code blocks.
+    """
+    html = {key: textwrap.dedent(raw).strip() for key, raw in _STATIC.items()}
+    cards = "".join(
+        f'<article class="feature-card"><div class="feature-icon">{icon}</div><h3>{title}</h3><p>{desc}</p></article>'
+        for icon, title, desc in _FEATURES
+    )
+    html["features"] = html["features"].format(cards=cards)
+    # About/features/contact/footer sit below the hero buttons and go out as one delta
+    html["home_body"] = "\n".join(html[key] for key in ("about", "features", "contact", "footer"))
+    return html
+
+
+# Constructor overrides per engine attribute
+_ENGINE_KWARGS = {
+    # int8 ONNX embeddings and reranker (fall back to float32 if the runtime is missing)
+    "hybrid_search": {
+        "embedding_dtype": os.getenv("EMBEDDING_DTYPE", "int8"),
+        "reranker_dtype": os.getenv("RERANKER_DTYPE", "int8"),
+    },
+}
+
+@st.cache_resource(show_spinner=False)
+def _get_rag_engine():
+    """The chat/summary LLM engine, built once and shared by every session.
+
+    Raises if the engine can't be constructed (missing packages or key); failures
+    are not cached, so callers fall back and a later call retries.
+    """
+    from rag_engine.multilingual_rag import MultilingualRAGEngine
+    return MultilingualRAGEngine()
+
+@st.cache_resource(show_spinner="Loading AI engines...")
+def _get_engines():
+    """Construct the RAG engines and feature services once per server process.
+
+    Constructors mostly load models and open clients (I/O and C extensions that
+    release the GIL), so they are built concurrently: wall-clock is roughly the
+    slowest engine rather than the sum of all of them.
+    """
+    ctx = get_script_run_ctx()
+
+    def build(attr, cls):
+        # Some constructors touch st.session_state / st.warning
+        add_script_run_ctx(threading.current_thread(), ctx)
+        if attr == "multilingual_rag":
+            # Same instance the chat and summary paths use directly
+            return _get_rag_engine()
+        return cls(**_ENGINE_KWARGS.get(attr, {}))
+
+    with ThreadPoolExecutor(max_workers=8, thread_name_prefix="yeneta-init") as pool:
+        futures = {attr: pool.submit(build, attr, cls) for attr, cls in _RAG_CLASSES.items()}
+        return {attr: future.result() for attr, future in futures.items()}
+
+def _digest_bytes(data: bytes) -> bytes:
+    """Cheap cache key for uploaded file bytes (avoids Streamlit pickling them)"""
+    if blake3 is not None:
+        # SIMD-accelerated; hashing a multi-MB upload costs microseconds
+        return blake3.blake3(data).digest(length=16)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+# Only the first pages feed the chat context / summaries
+_PDF_PAGE_LIMIT = 10
+
+# PDFium is not thread-safe: only one thread in the process may call into it
+_pdfium_lock = threading.Lock()
+
+def _handle_pdf_pdfium(data: bytes) -> str:
+    # PDFium (C++) parses several times faster than pypdf
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return "\n".join(
+                pdf[i].get_textpage().get_text_range() for i in range(min(_PDF_PAGE_LIMIT, len(pdf)))
+            )
+        finally:
+            pdf.close()
+
+def _handle_pdf_pypdf(data: bytes) -> str:
+    if PdfReader is None:
+        return ""
+    reader = PdfReader(BytesIO(data))
+    return "\n".join((page.extract_text() or "") for page in reader.pages[:_PDF_PAGE_LIMIT])
+
+_handle_pdf = _handle_pdf_pdfium if pdfium is not None else _handle_pdf_pypdf
+
+def _handle_docx(data: bytes) -> str:
+    if docx is None:
+        return ""
+    doc = docx.Document(BytesIO(data))
+    return "\n".join(p.text for p in doc.paragraphs)
+
+def _handle_text(data: bytes) -> str:
+    # Markdown / Text
+    return data.decode('utf-8', errors='ignore')
+
+# Extension -> parser; anything else is decoded as text
+_HANDLERS = {".pdf": _handle_pdf, ".docx": _handle_docx}
+
+@st.cache_resource
+def _parse_pool():
+    """Process-wide worker pool for document parsing.
+
+    Threads rather than processes: the parsers are already imported once per
+    server process and Streamlit's __main__ script functions are not reliably
+    picklable for a process pool. PDF parses are serialised by _pdfium_lock,
+    so the pool overlaps a PDF with DOCX/text uploads, never two PDFs.
+    """
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="yeneta-parse")
+
+@st.cache_data(show_spinner=False, hash_funcs={bytes: _digest_bytes})
+def _extract_text_cached(data: bytes, filename: str) -> str:
+    """Parse an uploaded document once; reruns with the same bytes hit the cache"""
+    if not data:
+        return ""
+    handler = _HANDLERS.get(os.path.splitext(filename)[1].lower(), _handle_text)
+    try:
+        return handler(data)
+    except Exception:
+        # Corrupt/encrypted documents: log for diagnosis, show no text
+        logger.exception(f"Text extraction failed for {filename}")
+        return ""
+
+def _pair_messages(messages, pairs, pending=None):
+    """Append user/assistant pairs from messages to pairs; returns the unanswered question"""
+    for m in messages:
+        if m.get("role") == "user":
+            pending = m
+        elif m.get("role") == "assistant" and pending:
+            pairs.append({"q": pending, "a": m})
+            pending = None
+    return pending
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_pairs(messages: tuple, query: str, subject: str) -> list:
+    """Filter (role, content, lowercased content, subject) rows and group them into Q/A pairs"""
+    items = [{"role": role, "content": content, "lc": lc, "subject": tag} for role, content, lc, tag in messages]
+    if query:
+        needle = query.lower()
+        items = [m for m in items if needle in m["lc"]]
+    if subject:
+        items = [m for m in items if m["subject"] == subject]
+    pairs = []
+    _pair_messages(items, pairs)
+    return pairs
+
+def _append_message(role: str, content: str, **extra):
+    """Append a chat message and keep the per-role counters in step"""
+    st.session_state.messages.append({"role": role, "content": content, **extra})
+    st.session_state.messages_lc.append(content.lower())
+    if role == "user":
+        st.session_state.user_msg_count += 1
+    elif role == "assistant":
+        st.session_state.asst_msg_count += 1
+
+# Chat messages rendered per "Show older" step
+_CHAT_PAGE = 30
+
+# Offline answers quote at most this much of the uploaded files, built from
+# chunks of about _CHUNK_CHARS ranked by BM25 against the question
+_EXCERPT_CHARS = 800
+_CHUNK_CHARS = 400
+_WORD_RE = re.compile(r"\w+")
+
+def _chunk_text(text: str) -> list:
+    """Split text into paragraph-aligned chunks of roughly _CHUNK_CHARS"""
+    chunks, current = [], ""
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        # PDF text often has no blank lines; cut long runs into fixed windows
+        for start in range(0, len(para), _CHUNK_CHARS):
+            piece = para[start:start + _CHUNK_CHARS]
+            if current and len(current) + len(piece) > _CHUNK_CHARS:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _bm25_index(file_keys: tuple, _texts: tuple):
+    """(chunks, BM25Okapi) over the uploaded files identified by file_keys"""
+    chunks = [chunk for text in _texts for chunk in _chunk_text(text)]
+    if not chunks:
+        return chunks, None
+    return chunks, BM25Okapi([_WORD_RE.findall(chunk.lower()) for chunk in chunks])
+
+# One quiz item per line: optional "1." numbering and "Q:"/"Question 1:" label
+_QA_RE = re.compile(r"^\s*(?:\d+[.)]\s*)?(?:Q[^:]*:\s*)?(?P<q>.+?)\s+A:\s*(?P<a>.+?)\s*$")
+
+# Profile language label -> engine language code
+_LANG_MAP = {
+    "English": "en",
+    "Amharic": "am",
+    "Afaan Oromo": "om",
+    "Tigrigna": "ti",
+    "Yoruba": "yo",
+    "Swahili": "sw",
+}
+
+def _normalize_page(raw):
+    """Page name from the ?page= query value ("Sign+Up" -> "Sign Up"); None if absent"""
+    if not raw:
+        return None
+    return raw.replace('+', ' ')
+
+_SESSION_DEFAULTS = {
+    "authenticated": False,
+    "user": None,
+    "current_page": "Home",
+    "show_public": False,
+    "messages": [],
+    # Lowercased message contents, parallel to messages, for history search
+    "messages_lc": [],
+    # Number of most recent messages rendered in the chat tab
+    "chat_window": _CHAT_PAGE,
+    # Running per-role totals maintained by _append_message
+    "user_msg_count": 0,
+    "asst_msg_count": 0,
+    "message_subjects": {},
+    # Unfiltered history pairs, extended as messages are appended
+    "history_pairs": {"seen": 0, "pending": None, "pairs": []},
+    "rag_engines_initialized": False,
+    "uploaded_files": [],
+    # Names in uploaded_files, for O(1) duplicate checks
+    "uploaded_names": set(),
+    "file_summaries": {},
+    "study_plans": {},
+    "quizzes": {},
+    "user_profile": {
+        "name": "Student",
+        "email": "student@yeneta.com",
+        "language_preference": "English",
+        "learning_level": "Beginner"
+    },
+}
+
+class YenetaApp:
+    """Stateless renderer; all per-user data lives in st.session_state"""
+    
+    def _extract_text_from_bytes(self, data: bytes, filename: str) -> str:
+        """Best-effort text extraction from common doc types for local context building."""
+        return _extract_text_cached(data, filename)
+
+    def _prefetch_text(self, files):
+        """Extract text for new uploads once, concurrently for batches, onto file_info["text"]"""
+        pending = [f for f in files if "text" not in f]
+        if len(pending) < 2:
+            for f in pending:
+                self._file_text(f)
+            return
+        ctx = get_script_run_ctx()
+
+        def extract(f):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return self._file_text(f)
+
+        with st.spinner("Reading files..."):
+            list(_parse_pool().map(extract, pending))
+
+    def _relevant_excerpt(self, query):
+        """Best-matching uploaded-file chunks for query, or None when BM25 finds no overlap"""
+        files = st.session_state.uploaded_files
+        if BM25Okapi is None or not files:
+            return None
+        terms = _WORD_RE.findall(query.lower())
+        if not terms:
+            return None
+        # Indexed once per set of uploads; reruns and later questions reuse it
+        keys = tuple(f.get("hash", f.get("name")) for f in files)
+        chunks, bm25 = _bm25_index(keys, tuple(self._file_text(f) for f in files))
+        if bm25 is None:
+            return None
+        scores = bm25.get_scores(terms)
+        picked, total = [], 0
+        for i in sorted(range(len(chunks)), key=scores.__getitem__, reverse=True):
+            if scores[i] <= 0 or total >= _EXCERPT_CHARS:
+                break
+            picked.append(chunks[i][:_EXCERPT_CHARS - total])
+            total += len(picked[-1])
+        return "\n\n...\n\n".join(picked) or None
+
+    def _file_text(self, f):
+        """Extracted text of an uploaded file, parsed at most once per session"""
+        if "text" not in f:
+            content = f.get("content")
+            if isinstance(content, bytes):
+                f["text"] = self._extract_text_from_bytes(content, f.get("name", ""))
+            else:
+                f["text"] = str(content) if content is not None else ""
+        return f["text"]
+    
+    def initialize_session_state(self):
+        """Fill in missing session keys from _SESSION_DEFAULTS; existing values are kept"""
+        state = st.session_state
+        for key, default in _SESSION_DEFAULTS.items():
+            if key not in state:
+                # Fresh copy so mutable defaults are never shared across sessions.
+                # Not setdefault(): that would deep-copy every default on every rerun.
+                state[key] = copy.deepcopy(default)
+    
+    def setup_rag_engines(self):
+        """Initialize all RAG engines"""
+        if not _lazy_rag_imports():
+            return
+        try:
+            if not GROQ_API_KEY and not st.session_state.get('rag_engines_initialized', False):
+                st.warning("⚠️ GROQ_API_KEY not found. AI responses may be limited.")
+            
+            for attr, engine in _get_engines().items():
+                setattr(self, attr, engine)
+            # Engines are shared process-wide but keep per-user data in session
+            # state; seed it for this session (no-op when already present)
+            self.memory_rag._init_memory_structures()
+            self.progress_tracker._init_progress_data()
+            
+            st.session_state.rag_engines_initialized = True
+            
+        except Exception as e:
+            st.error(f"❌ Error initializing RAG engines: {e}")
+            st.session_state.rag_engines_initialized = False
+
+    def _navigate(self, page):
+        """Widget callback: route via the URL before the script body runs, so no extra rerun is needed"""
+        st.query_params["page"] = page
+        st.session_state.current_page = page
+
+    def render_navigation(self):
+        """Render the main navigation bar"""
+        # Visual header bar with inline nav next to logo
+        st.markdown(_static_html()["nav"], unsafe_allow_html=True)
+
+    def render_hero_section(self):
+        """Render the hero section with Nelson Mandela quote"""
+        st.markdown(_static_html()["hero"], unsafe_allow_html=True)
+        
+        # Hero buttons using Streamlit
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            st.markdown('<div class="hero-buttons">', unsafe_allow_html=True)
+            col_btn1, col_btn2 = st.columns(2)
+            with col_btn1:
+                st.button("🚀 Join Now", key="hero_join_btn", help="Create your account", use_container_width=True,
+                          on_click=self._navigate, args=("Sign Up",))
+            with col_btn2:
+                st.button("🔑 Login", key="hero_login_btn", help="Sign in to your account", use_container_width=True,
+                          on_click=self._navigate, args=("Login",))
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    def render_about_section(self):
+        """Render the about us section"""
+        st.markdown(_static_html()["about"], unsafe_allow_html=True)
+        
+        # Removed duplicated metrics to avoid repetition under About section
+
+    def render_features_section(self):
+        """Render the features section"""
+        st.markdown(_static_html()["features"], unsafe_allow_html=True)
+
+    def render_contact_section(self):
+        """Render the contact section"""
+        st.markdown(_static_html()["contact"], unsafe_allow_html=True)
+
+    def render_footer(self):
+        """Render the footer"""
+        st.markdown(_static_html()["footer"], unsafe_allow_html=True)
+
+    def render_home_body(self):
+        """Render about, features, contact and footer as a single markdown delta"""
+        st.markdown(_static_html()["home_body"], unsafe_allow_html=True)
 
     def render_auth_section(self):
         """Render authentication section"""
@@ -1187,29 +1362,22 @@ document.addEventListener('click', function(e){
                     else:
                         st.error("❌ Passwords do not match.")
 
+    def _go_home(self):
+        """Button callback: leave the dashboard for the public site"""
+        st.session_state.show_public = True
+        self._navigate("Home")
+
     def render_dashboard(self):
         """Render the student dashboard with tabs"""
         # Header with home button to return to the main website
         top_col1, top_col2 = st.columns([1, 5])
         with top_col1:
-            if st.button("🏠 Home", key="dashboard_home_btn"):
-                st.session_state.show_public = True
-                st.session_state.current_page = "Home"
-                st.rerun()
+            st.button("🏠 Home", key="dashboard_home_btn", on_click=self._go_home)
         with top_col2:
             st.markdown("### 📊 Student Dashboard")
         st.markdown(f"Welcome back, {st.session_state.user_profile['name']}! Here's your learning overview")
         
-        # Quick stats
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Questions Asked", len([m for m in st.session_state.messages if m["role"] == "user"]))
-        with col2:
-            st.metric("Files Uploaded", len(st.session_state.uploaded_files))
-        with col3:
-            st.metric("Learning Level", st.session_state.user_profile['learning_level'])
-        with col4:
-            st.metric("Language", st.session_state.user_profile['language_preference'])
+        self._quick_stats()
         
         # Tab navigation
         tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["💬 Chat", "🕒 History", "📚 Study Plan", "📁 Files", "🧪 Quizzes", "👤 Profile/Progress"])
@@ -1230,6 +1398,25 @@ document.addEventListener('click', function(e){
             st.markdown("---")
             self.render_progress_tab()
 
+    @st.fragment
+    def _quick_stats(self):
+        """Quick-stats row; a fragment so tab interactions don't recompute it.
+
+        Tabs that change these counts (new uploads, chat messages, file
+        deletes) end with an app-scope st.rerun() so the row stays current.
+        """
+        state = st.session_state
+        profile = state.user_profile
+        stats = (
+            ("Questions Asked", state.user_msg_count),
+            ("Files Uploaded", len(state.uploaded_files)),
+            ("Learning Level", profile['learning_level']),
+            ("Language", profile['language_preference']),
+        )
+        for col, (label, value) in zip(st.columns(len(stats)), stats):
+            col.metric(label, value)
+
+    @st.fragment
     def render_history_tab(self):
         st.markdown("#### 🕒 Session History")
         # Filters
@@ -1238,24 +1425,16 @@ document.addEventListener('click', function(e){
             query = st.text_input("Search questions/answers")
         with fcol2:
             subject = st.text_input("Subject tag (optional)")
-        # Filter
-        items = list(st.session_state.messages)
-        if query:
-            items = [m for m in items if query.lower() in m.get("content", "").lower()]
-        if subject:
-            items = [m for m in items if m.get("subject") == subject]
         # Show last N grouped user+assistant pairs
         st.markdown("##### Recent interactions")
-        # Build pairs
-        pairs = []
-        current = {}
-        for m in items:
-            if m.get("role") == "user":
-                current = {"q": m}
-            elif m.get("role") == "assistant" and current:
-                current["a"] = m
-                pairs.append(current)
-                current = {}
+        if query or subject:
+            messages = tuple(
+                (m["role"], m.get("content", ""), lc, m.get("subject", ""))
+                for m, lc in zip(st.session_state.messages, st.session_state.messages_lc)
+            )
+            pairs = _build_pairs(messages, query, subject)
+        else:
+            pairs = self._history_pairs()
         for idx, pair in enumerate(reversed(pairs[-20:])):
             q = pair.get("q", {})
             a = pair.get("a", {})
@@ -1268,22 +1447,24 @@ document.addEventListener('click', function(e){
                     if st.button("Revisit", key=f"rev_{idx}"):
                         st.session_state.current_page = "Dashboard"
                         st.session_state.show_public = False
-                        st.session_state.messages.append({"role": "user", "content": q.get("content", "")})
+                        _append_message("user", q.get("content", ""))
                         st.rerun()
                 with c2:
                     if st.button("Improve answer", key=f"imp_{idx}"):
                         improve_prompt = f"Improve this answer for clarity and completeness, keep it concise. Answer: {a.get('content','')} Context: {q.get('content','')}"
-                        st.session_state.messages.append({"role": "user", "content": improve_prompt})
+                        _append_message("user", improve_prompt)
                         st.rerun()
 
-    def _ensure_multilingual(self):
-        if not hasattr(self, 'multilingual_rag'):
-            try:
-                from rag_engine.multilingual_rag import MultilingualRAGEngine
-                self.multilingual_rag = MultilingualRAGEngine()
-            except Exception as e:
-                st.warning(f"RAG engine not available: {e}")
+    def _history_pairs(self):
+        """Unfiltered Q/A pairs; only messages appended since the last call are scanned"""
+        cache = st.session_state.history_pairs
+        messages = st.session_state.messages
+        if cache["seen"] < len(messages):
+            cache["pending"] = _pair_messages(messages[cache["seen"]:], cache["pairs"], cache["pending"])
+            cache["seen"] = len(messages)
+        return cache["pairs"]
 
+    @st.fragment
     def render_study_plan_tab(self):
         st.markdown("#### 📚 Study Plan")
         subj = st.text_input("Subject", placeholder="e.g., Mathematics")
@@ -1295,8 +1476,8 @@ document.addEventListener('click', function(e){
                 st.success("Study plan generated.")
         with c2:
             if subj and subj in st.session_state.study_plans and st.button("Clear Plan"):
+                # The display below re-checks study_plans, so no rerun is needed
                 st.session_state.study_plans.pop(subj, None)
-                st.rerun()
         # Display
         if subj and subj in st.session_state.study_plans:
             modules = st.session_state.study_plans[subj]["modules"]
@@ -1325,6 +1506,7 @@ document.addEventListener('click', function(e){
             base.append({"title": f"Practice: {q[:40]}...", "status": "todo", "difficulty": "medium"})
         return base[:8]
 
+    @st.fragment
     def render_files_tab(self):
         st.markdown("#### 📁 Files Intelligence")
         if not st.session_state.uploaded_files:
@@ -1332,36 +1514,38 @@ document.addEventListener('click', function(e){
             return
         for f in st.session_state.uploaded_files:
             name = f.get("name","unknown")
-            summary_obj = st.session_state.file_summaries.get(name)
+            # Keyed on content so a renamed or re-uploaded copy reuses its summary
+            summary_key = f.get("hash", name)
+            summary_obj = st.session_state.file_summaries.get(summary_key)
             colA, colB = st.columns([3,1])
             with colA:
                 st.markdown(f"**{name}**")
             with colB:
                 if st.button("Refresh summary", key=f"refresh_{name}"):
-                    st.session_state.file_summaries.pop(name, None)
-                    st.rerun()
+                    st.session_state.file_summaries.pop(summary_key, None)
+                    summary_obj = None
             if not summary_obj:
                 with st.spinner("Summarizing..."):
-                    text = self._extract_text_from_bytes(f.get("content", b""), name) if isinstance(f.get("content"), bytes) else (f.get("content") or "")
-                    self._ensure_multilingual()
+                    text = self._file_text(f)
                     if text:
                         prompt = "Summarize this content concisely, list 5 bullet key points, and suggest 5 quiz questions.\n\n" + text[:4000]
                         try:
-                            result = self.multilingual_rag.generate_multilingual_response(query=prompt, context="", target_language="en")
+                            result = _get_rag_engine().generate_multilingual_response(query=prompt, context="", target_language="en")
                         except Exception as e:
                             result = f"Summary unavailable: {e}"
                     else:
                         result = "No extractable text."
-                    st.session_state.file_summaries[name] = {"raw": result}
-                    summary_obj = st.session_state.file_summaries[name]
+                    st.session_state.file_summaries[summary_key] = {"raw": result}
+                    summary_obj = st.session_state.file_summaries[summary_key]
             with st.expander("Summary / Key Points / Suggested Quiz"):
                 st.write(summary_obj.get("raw",""))
             if st.button("Ask about this file", key=f"ask_{name}"):
                 st.session_state.current_page = "Dashboard"
                 st.session_state.show_public = False
-                st.session_state.messages.append({"role": "user", "content": f"Based on {name}, explain the main ideas and give examples."})
+                _append_message("user", f"Based on {name}, explain the main ideas and give examples.")
                 st.rerun()
 
+    @st.fragment
     def render_quizzes_tab(self):
         st.markdown("#### 🧪 Quizzes")
         subj = st.text_input("Subject for quiz", key="quiz_subject")
@@ -1374,7 +1558,6 @@ document.addEventListener('click', function(e){
         with c2:
             if subj and subj in st.session_state.quizzes and st.button("Clear quiz"):
                 st.session_state.quizzes.pop(subj, None)
-                st.rerun()
         if subj and subj in st.session_state.quizzes:
             data = st.session_state.quizzes[subj]
             for i, q in enumerate(data["questions"]):
@@ -1386,29 +1569,31 @@ document.addEventListener('click', function(e){
                     st.write(q.get("explain",""))
 
     def _generate_quiz(self, subject: str, n: int):
-        self._ensure_multilingual()
         try:
             prompt = f"Create {n} short quiz questions about {subject}. For each, provide: Question, Correct answer, and a 1-sentence explanation."
-            result = self.multilingual_rag.generate_multilingual_response(query=prompt, context="", target_language="en")
+            result = _get_rag_engine().generate_multilingual_response(query=prompt, context="", target_language="en")
         except Exception as e:
             result = f"Quiz generation unavailable: {e}"
-        # Very light parser: split lines
+        # Very light parser: one "Q: ... A: ..." pair per line
         questions = []
         for line in result.splitlines():
-            if not line.strip():
-                continue
-            if ':' in line:
-                # naive parse: "Q: ... A: ..."
-                parts = line.split('A:')
-                if len(parts) == 2:
-                    qtext = parts[0].replace('Q','').replace(':','').strip()
-                    atext = parts[1].strip()
-                    questions.append({"q": qtext, "a": atext, "explain": ""})
+            m = _QA_RE.match(line)
+            if m:
+                questions.append({"q": m["q"], "a": m["a"], "explain": ""})
         if not questions:
             # fallback single item
             questions = [{"q": f"What is a key concept in {subject}?", "a": "Definition and example.", "explain": "Concept overview."} for _ in range(n)]
         return questions[:n]
 
+    def _delete_file(self, index: int):
+        """Forget an uploaded file and the name that blocks its re-upload"""
+        removed = st.session_state.uploaded_files.pop(index)
+        st.session_state.uploaded_names.discard(removed["name"])
+
+    def _show_older_messages(self):
+        st.session_state.chat_window += _CHAT_PAGE
+
+    @st.fragment
     def render_chat_tab(self):
         """Render the chat tab with file upload and AI chat"""
         st.markdown("#### 💬 AI Study Assistant")
@@ -1424,18 +1609,33 @@ document.addEventListener('click', function(e){
         )
         
         if uploaded_files:
+            # The uploader hands back every file on each rerun; only read new ones
+            existing = st.session_state.uploaded_names
+            new_files = []
             for uploaded_file in uploaded_files:
+                if uploaded_file.name in existing:
+                    continue
+                existing.add(uploaded_file.name)
+                content = uploaded_file.read()
                 file_info = {
                     "name": uploaded_file.name,
                     "size": uploaded_file.size,
                     "type": uploaded_file.type,
                     "upload_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                    "content": uploaded_file.read()
+                    "content": content,
+                    "hash": _digest_bytes(content).hex()
                 }
-                
-                if not any(f["name"] == file_info["name"] for f in st.session_state.uploaded_files):
-                    st.session_state.uploaded_files.append(file_info)
-                    st.success(f"✅ Uploaded: {uploaded_file.name}")
+                st.session_state.uploaded_files.append(file_info)
+                new_files.append(file_info)
+                # A toast survives the rerun below
+                st.toast(f"✅ Uploaded: {uploaded_file.name}")
+            if new_files:
+                self._prefetch_text(new_files)
+                for file_info in new_files:
+                    # Only the extracted text is used from here on
+                    del file_info["content"]
+                # Full rerun: the Files tab and quick stats list uploads too
+                st.rerun()
         
         # Show uploaded files
         if st.session_state.uploaded_files:
@@ -1448,7 +1648,8 @@ document.addEventListener('click', function(e){
                     st.write(f"{file_info['size']} bytes")
                 with col3:
                     if st.button("🗑️", key=f"delete_file_{i}", help="Delete file"):
-                        st.session_state.uploaded_files.pop(i)
+                        self._delete_file(i)
+                        # Full rerun: the Files tab and quick stats list uploads too
                         st.rerun()
         
         st.markdown("---")
@@ -1457,16 +1658,21 @@ document.addEventListener('click', function(e){
         language = st.session_state.user_profile.get('language_preference', 'English')
         level = st.session_state.user_profile.get('learning_level', 'Beginner')
         
-        # Chat messages
+        # Chat messages; only the latest window is rendered
         st.markdown("##### 💬 Chat with AI")
-        for message in st.session_state.messages:
+        messages = st.session_state.messages
+        hidden = len(messages) - st.session_state.chat_window
+        if hidden > 0:
+            st.button(f"Show {min(_CHAT_PAGE, hidden)} older", key="chat_show_older",
+                      on_click=self._show_older_messages)
+        for message in messages[-st.session_state.chat_window:]:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
         
         # Chat input
         if prompt := st.chat_input("Ask me anything about your studies..."):
             # Add user message
-            st.session_state.messages.append({"role": "user", "content": prompt})
+            _append_message("user", prompt)
             
             # Display user message
             with st.chat_message("user"):
@@ -1474,13 +1680,15 @@ document.addEventListener('click', function(e){
             
             # Generate AI response
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    response = self.generate_ai_response(prompt, language, level)
-                    st.markdown(response)
+                # Rendered incrementally as chunks arrive; returns the full text
+                response = st.write_stream(self.generate_ai_response(prompt, language, level))
             
             # Add AI response
-            st.session_state.messages.append({"role": "assistant", "content": response})
+            _append_message("assistant", response)
+            # Full rerun: the History tab and quick stats show messages too
+            st.rerun()
 
+    @st.fragment
     def render_profile_tab(self):
         """Render the profile tab for editing user settings"""
         st.markdown("#### 👤 Profile Settings")
@@ -1519,12 +1727,13 @@ document.addEventListener('click', function(e){
         st.markdown("##### 📊 Account Statistics")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Questions", len([m for m in st.session_state.messages if m["role"] == "user"]))
+            st.metric("Total Questions", st.session_state.user_msg_count)
         with col2:
             st.metric("Files Uploaded", len(st.session_state.uploaded_files))
         with col3:
             st.metric("Account Created", "Today")
 
+    @st.fragment
     def render_progress_tab(self):
         """Render the progress tab with statistics and analytics"""
         st.markdown("#### 📈 Learning Progress")
@@ -1533,9 +1742,9 @@ document.addEventListener('click', function(e){
         # Progress metrics
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Questions Asked", len([m for m in st.session_state.messages if m["role"] == "user"]))
+            st.metric("Questions Asked", st.session_state.user_msg_count)
         with col2:
-            st.metric("AI Responses", len([m for m in st.session_state.messages if m["role"] == "assistant"]))
+            st.metric("AI Responses", st.session_state.asst_msg_count)
         with col3:
             st.metric("Files Uploaded", len(st.session_state.uploaded_files))
         with col4:
@@ -1544,15 +1753,13 @@ document.addEventListener('click', function(e){
         # Progress chart
         if st.session_state.messages:
             st.markdown("##### 📊 Daily Activity")
-            # Create a simple progress chart
+            # Create a simple progress chart (built-in chart; no plotly import)
             progress_data = {
                 "Date": [datetime.now().strftime("%Y-%m-%d")],
-                "Questions": [len([m for m in st.session_state.messages if m["role"] == "user"])]
+                "Questions": [st.session_state.user_msg_count]
             }
-            
-            df = pd.DataFrame(progress_data)
-            fig = px.bar(df, x="Date", y="Questions", title="Questions Asked Today")
-            st.plotly_chart(fig, use_container_width=True)
+            st.caption("Questions Asked Today")
+            st.bar_chart(progress_data, x="Date", y="Questions", use_container_width=True)
         
         # Learning streaks
         st.markdown("##### 🔥 Learning Streaks")
@@ -1599,66 +1806,48 @@ document.addEventListener('click', function(e){
         return True
 
     def generate_ai_response(self, prompt, language, level):
-        """Generate AI response using RAG"""
+        """Generate AI response using RAG, yielded in chunks for st.write_stream"""
         try:
             # Build retrieval context from uploaded files
             context_chunks = []
             max_chars = 4000
+            total = 0
             if st.session_state.get('uploaded_files'):
                 for f in st.session_state.uploaded_files:
-                    content = f.get('content')
-                    if isinstance(content, bytes):
-                        text = self._extract_text_from_bytes(content, f.get('name',''))
-                    else:
-                        text = str(content) if content is not None else ""
-                    if text:
-                        context_chunks.append(f"[File: {f.get('name','unknown')}]\n{text}")
-                    if sum(len(c) for c in context_chunks) >= max_chars:
+                    text = self._file_text(f)
+                    if not text:
+                        continue
+                    # Slice before formatting so a multi-MB document is never copied whole
+                    piece = f"[File: {f.get('name','unknown')}]\n{text[:max_chars - total]}"
+                    context_chunks.append(piece)
+                    total += len(piece)
+                    if total >= max_chars:
                         break
             context = "\n\n".join(context_chunks)[:max_chars]
 
-            # Map selected language to engine language code
-            lang_map = {
-                'English': 'en',
-                'Amharic': 'am',
-                'Afaan Oromo': 'om',
-                'Tigrigna': 'ti',
-                'Yoruba': 'yo',
-                'Swahili': 'sw',
-            }
-            # language values look like "🇺🇸 English"; take the last token(s)
+            # Map selected language to engine language code; older values
+            # carried a flag prefix ("🇺🇸 English"), so retry without it
             selected = language.strip()
-            for label in lang_map.keys():
-                if label in selected:
-                    target_lang = lang_map[label]
-                    break
-            else:
-                target_lang = 'en'
+            target_lang = _LANG_MAP.get(selected) or _LANG_MAP.get(selected.split(" ", 1)[-1], "en")
 
-            # Ensure RAG engines are initialized if available
-            if RAG_AVAILABLE and not st.session_state.get('rag_engines_initialized', False):
-                self.setup_rag_engines()
-
-            # Ensure the RAG engine exists (lazy init if needed)
-            if not hasattr(self, 'multilingual_rag'):
-                try:
-                    from rag_engine.multilingual_rag import MultilingualRAGEngine  # lazy import
-                    self.multilingual_rag = MultilingualRAGEngine()
-                    st.session_state.rag_engines_initialized = True
-                except Exception as e:
-                    st.warning(f"RAG engine init failed: {e}")
+            try:
+                engine = _get_rag_engine()
+            except Exception as e:
+                engine = None
+                st.warning(f"RAG engine init failed: {e}")
 
             # Try the RAG engine if available
-            if hasattr(self, 'multilingual_rag'):
-                response = self.multilingual_rag.generate_multilingual_response(
+            if engine is not None:
+                yield from engine.stream_multilingual_response(
                     query=prompt,
                     context=context,
                     target_language=target_lang
                 )
+                return
             else:
                 # Local fallback: extractive answer from uploaded file context
                 if context:
-                    excerpt = context[:800]
+                    excerpt = self._relevant_excerpt(prompt) or context[:_EXCERPT_CHARS]
                     response = f"Here is what I found in your uploaded files related to your question:\n\n{excerpt}\n\n(Answer generated from uploaded file content. Add GROQ_API_KEY to enable full AI responses.)"
                 else:
                     response = f"""
@@ -1676,23 +1865,23 @@ document.addEventListener('click', function(e){
                     - Self-validation for accuracy
                     """
             
-            return response
+            yield response
             
         except Exception as e:
-            return f"Sorry, I encountered an error: {e}. Please try again."
+            yield f"Sorry, I encountered an error: {e}. Please try again."
 
     def run(self):
         """Main application runner"""
+        _inject_css()
+        self.initialize_session_state()
+        # Anonymous visitors only see static pages; engines load after login
+        if st.session_state.authenticated:
+            self.setup_rag_engines()
+
         # Sync page with URL query parameter if present
-        query_params = st.query_params if hasattr(st, 'query_params') else st.experimental_get_query_params()
-        if query_params:
-            url_page = query_params.get('page')
-            if isinstance(url_page, list):
-                url_page = url_page[0]
-            if url_page:
-                # Normalize spaces and capitalization
-                url_page = url_page.replace('+', ' ')
-                st.session_state.current_page = url_page
+        url_page = _normalize_page(st.query_params.get("page"))
+        if url_page:
+            st.session_state.current_page = url_page
 
         page = st.session_state.current_page
 
@@ -1700,31 +1889,9 @@ document.addEventListener('click', function(e){
             # Public website pages - render navigation once
             self.render_navigation()
             
-            if page == "Home":
-                self.render_hero_section()
-                self.render_about_section()
-                self.render_features_section()
-                self.render_contact_section()
-                self.render_footer()
-            elif page == "About":
-                self.render_about_section()
-                self.render_footer()
-            elif page == "Features":
-                self.render_features_section()
-                self.render_footer()
-            elif page == "Contact":
-                self.render_contact_section()
-                self.render_footer()
-            elif page == "Login" or page == "Sign Up":
-                # If coming from dashboard Home, keep authenticated but show auth section if explicitly chosen
-                self.render_auth_section()
-            else:
-                # Default to Home
-                self.render_hero_section()
-                self.render_about_section()
-                self.render_features_section()
-                self.render_contact_section()
-                self.render_footer()
+            # Unknown pages fall back to Home
+            for render in _PAGE_DISPATCH.get(page, _PAGE_DISPATCH["Home"]):
+                render(self)
             # If we showed public site while authenticated, stop here
             if st.session_state.get('show_public'):
                 return
@@ -1732,6 +1899,17 @@ document.addEventListener('click', function(e){
             # Student dashboard after login
             self.render_dashboard()
 
+# Render methods for each public page, in order. Login/Sign Up show the auth
+# section even when reached from the dashboard while authenticated
+_PAGE_DISPATCH = {
+    "Home": (YenetaApp.render_hero_section, YenetaApp.render_home_body),
+    "About": (YenetaApp.render_about_section, YenetaApp.render_footer),
+    "Features": (YenetaApp.render_features_section, YenetaApp.render_footer),
+    "Contact": (YenetaApp.render_contact_section, YenetaApp.render_footer),
+    "Login": (YenetaApp.render_auth_section,),
+    "Sign Up": (YenetaApp.render_auth_section,),
+}
+
 def main():
     """Main entry point"""
     app = YenetaApp()
@@ -4,6 +4,6 @@ Yeneta Configuration Package
 This package contains all configuration settings for the Yeneta platform.
 """
 
-from .app_config import AppConfig
+from .app_config import AppConfig, get_config
 
-__all__ = ["AppConfig"]
+__all__ = ["AppConfig", "get_config"]
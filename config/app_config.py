@@ -4,12 +4,108 @@ Centralized configuration management for Yeneta platform
 """
 
 import os
-from typing import Dict, List, Optional
+import json
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Final, FrozenSet, List, Mapping, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Snapshot of the environment (including .env) taken once at import;
+# AppConfig reads settings from here rather than from os.environ
+_ENV: Final[Mapping[str, str]] = dict(os.environ)
+_get = _ENV.get
+
+def _frozen(table: Dict[str, Dict]) -> Mapping[str, Mapping]:
+    """Read-only view of a two-level table, safe to share across threads"""
+    return MappingProxyType({key: MappingProxyType(value) for key, value in table.items()})
+
+# Static tables shared by every AppConfig; built once at import and read-only.
+# Languages live in languages.json so adding one needs no code change
+LANGUAGE_MAPPINGS: Final[Mapping[str, Mapping]] = _frozen(
+    json.loads(Path(__file__).with_name("languages.json").read_text(encoding="utf-8"))
+)
+
+LEARNING_LEVELS: Final[Mapping[str, Mapping]] = _frozen({
+    "beginner": {
+        "name": "Beginner",
+        "icon": "🌱",
+        "description": "Simple explanations with step-by-step guidance",
+        "complexity": 1,
+        "max_sentence_length": 15,
+        "use_examples": True,
+        "use_analogies": True,
+        "scaffolding": True
+    },
+    "intermediate": {
+        "name": "Intermediate",
+        "icon": "🌿", 
+        "description": "Balanced complexity with examples and reasoning",
+        "complexity": 2,
+        "max_sentence_length": 25,
+        "use_examples": True,
+        "use_analogies": False,
+        "scaffolding": False
+    },
+    "advanced": {
+        "name": "Advanced",
+        "icon": "🌳",
+        "description": "Complex reasoning with minimal hand-holding", 
+        "complexity": 3,
+        "max_sentence_length": 40,
+        "use_examples": False,
+        "use_analogies": False,
+        "scaffolding": False
+    }
+})
+
+RAG_SETTINGS: Final[Mapping] = MappingProxyType({
+    "chunk_size": 1000,
+    "chunk_overlap": 100,
+    "search_k": 10,
+    "reranker_top_n": 3,
+    "temperature": 0.1,
+    "max_tokens": 2048,
+    "timeout": 30
+})
+
+
+@lru_cache(maxsize=1)
+def _validate_settings(has_groq_key: bool, has_supabase_url: bool, has_supabase_key: bool,
+                       max_file_size: int, allowed_extensions: Tuple[str, ...],
+                       supported_languages: Tuple[str, ...], mapped_languages: FrozenSet[str]) -> Tuple[str, ...]:
+    """Configuration issues for a set of settings; recomputed only when they change"""
+    issues = []
+    
+    # Check required API keys
+    if not has_groq_key:
+        issues.append("GROQ_API_KEY is required")
+    
+    # Check Supabase configuration
+    if not has_supabase_url:
+        issues.append("SUPABASE_URL is required")
+    
+    if not has_supabase_key:
+        issues.append("SUPABASE_KEY is required")
+    
+    # Check file upload settings
+    if max_file_size <= 0:
+        issues.append("MAX_FILE_SIZE must be positive")
+    
+    if not allowed_extensions:
+        issues.append("ALLOWED_EXTENSIONS cannot be empty")
+    
+    # Check language settings
+    for lang in supported_languages:
+        if lang not in mapped_languages:
+            issues.append(f"Language {lang} not found in mappings")
+    
+    return tuple(issues)
+
+
 class AppConfig:
     """
     Centralized configuration class for Yeneta platform
@@ -18,150 +114,60 @@ class AppConfig:
     
     def __init__(self):
         # API Configuration
-        self.GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-        self.SUPABASE_URL = os.getenv("SUPABASE_URL", "")
-        self.SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
+        self.GROQ_API_KEY = _get("GROQ_API_KEY", "")
+        self.SUPABASE_URL = _get("SUPABASE_URL", "")
+        self.SUPABASE_KEY = _get("SUPABASE_KEY", "")
         
         # Application Settings
-        self.APP_NAME = os.getenv("APP_NAME", "Yeneta")
-        self.APP_VERSION = os.getenv("APP_VERSION", "1.0.0")
-        self.DEBUG = os.getenv("DEBUG", "True").lower() == "true"
-        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+        self.APP_NAME = _get("APP_NAME", "Yeneta")
+        self.APP_VERSION = _get("APP_VERSION", "1.0.0")
+        self.DEBUG = _get("DEBUG", "True").lower() == "true"
+        self.LOG_LEVEL = _get("LOG_LEVEL", "INFO")
         
         # RAG Configuration
-        self.EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-        self.CROSS_ENCODER_MODEL = os.getenv("CROSS_ENCODER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
-        self.CHROMA_PERSIST_DIRECTORY = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_store")
+        self.EMBEDDING_MODEL = _get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        self.EMBEDDING_DTYPE = _get("EMBEDDING_DTYPE", "int8")
+        self.CROSS_ENCODER_MODEL = _get("CROSS_ENCODER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+        self.RERANKER_DTYPE = _get("RERANKER_DTYPE", "int8")
+        self.CHROMA_PERSIST_DIRECTORY = _get("CHROMA_PERSIST_DIRECTORY", "./chroma_store")
         
         # Language Configuration
-        self.SUPPORTED_LANGUAGES = os.getenv("SUPPORTED_LANGUAGES", "am,om,ti,en,yo,sw").split(",")
-        self.DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "en")
+        self.SUPPORTED_LANGUAGES = _get("SUPPORTED_LANGUAGES", "am,om,ti,en,yo,sw").split(",")
+        self._SUPPORTED_LANGUAGES_SET = frozenset(self.SUPPORTED_LANGUAGES)
+        self.DEFAULT_LANGUAGE = _get("DEFAULT_LANGUAGE", "en")
         
         # Voice Configuration
-        self.VOICE_ENABLED = os.getenv("VOICE_ENABLED", "True").lower() == "true"
-        self.TTS_LANGUAGE = os.getenv("TTS_LANGUAGE", "en")
-        self.STT_LANGUAGE = os.getenv("STT_LANGUAGE", "en")
+        self.VOICE_ENABLED = _get("VOICE_ENABLED", "True").lower() == "true"
+        self.TTS_LANGUAGE = _get("TTS_LANGUAGE", "en")
+        self.STT_LANGUAGE = _get("STT_LANGUAGE", "en")
         
         # File Upload Configuration
-        self.MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB
-        self.ALLOWED_EXTENSIONS = os.getenv("ALLOWED_EXTENSIONS", "pdf,docx,txt,md").split(",")
+        self.MAX_FILE_SIZE = int(_get("MAX_FILE_SIZE", "10485760"))  # 10MB
+        self.ALLOWED_EXTENSIONS = _get("ALLOWED_EXTENSIONS", "pdf,docx,txt,md").split(",")
         
         # Cache Configuration
-        self.REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-        self.CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))
+        self.REDIS_URL = _get("REDIS_URL", "redis://localhost:6379")
+        self.CACHE_TTL = int(_get("CACHE_TTL", "3600"))
         
         # Security Configuration
-        self.SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_here")
-        self.JWT_SECRET = os.getenv("JWT_SECRET", "your_jwt_secret_here")
+        self.SECRET_KEY = _get("SECRET_KEY", "your_secret_key_here")
+        self.JWT_SECRET = _get("JWT_SECRET", "your_jwt_secret_here")
         
         # Monitoring Configuration
-        self.SENTRY_DSN = os.getenv("SENTRY_DSN", "")
+        self.SENTRY_DSN = _get("SENTRY_DSN", "")
         
-        # Initialize language mappings
-        self._init_language_mappings()
+        # Language table shared by all instances
+        self.LANGUAGE_MAPPINGS = LANGUAGE_MAPPINGS
         
         # Initialize RAG settings
         self._init_rag_settings()
     
-    def _init_language_mappings(self):
-        """Initialize language mappings and configurations"""
-        self.LANGUAGE_MAPPINGS = {
-            "en": {
-                "name": "English",
-                "native_name": "English",
-                "country": "Universal",
-                "flag": "🇺🇸",
-                "code": "en",
-                "rtl": False
-            },
-            "am": {
-                "name": "Amharic",
-                "native_name": "አማርኛ", 
-                "country": "Ethiopia",
-                "flag": "🇪🇹",
-                "code": "am",
-                "rtl": False
-            },
-            "om": {
-                "name": "Afaan Oromo",
-                "native_name": "Afaan Oromoo",
-                "country": "Ethiopia", 
-                "flag": "🇪🇹",
-                "code": "om",
-                "rtl": False
-            },
-            "ti": {
-                "name": "Tigrigna",
-                "native_name": "ትግርኛ",
-                "country": "Ethiopia/Eritrea",
-                "flag": "🇪🇹", 
-                "code": "ti",
-                "rtl": False
-            },
-            "yo": {
-                "name": "Yoruba",
-                "native_name": "Èdè Yorùbá",
-                "country": "Nigeria",
-                "flag": "🇳🇬",
-                "code": "yo", 
-                "rtl": False
-            },
-            "sw": {
-                "name": "Swahili",
-                "native_name": "Kiswahili",
-                "country": "East Africa",
-                "flag": "🇰🇪",
-                "code": "sw",
-                "rtl": False
-            }
-        }
-    
     def _init_rag_settings(self):
         """Initialize RAG-specific settings"""
-        self.RAG_SETTINGS = {
-            "chunk_size": 1000,
-            "chunk_overlap": 100,
-            "search_k": 10,
-            "reranker_top_n": 3,
-            "temperature": 0.1,
-            "max_tokens": 2048,
-            "timeout": 30
-        }
-        
-        self.LEARNING_LEVELS = {
-            "beginner": {
-                "name": "Beginner",
-                "icon": "🌱",
-                "description": "Simple explanations with step-by-step guidance",
-                "complexity": 1,
-                "max_sentence_length": 15,
-                "use_examples": True,
-                "use_analogies": True,
-                "scaffolding": True
-            },
-            "intermediate": {
-                "name": "Intermediate",
-                "icon": "🌿", 
-                "description": "Balanced complexity with examples and reasoning",
-                "complexity": 2,
-                "max_sentence_length": 25,
-                "use_examples": True,
-                "use_analogies": False,
-                "scaffolding": False
-            },
-            "advanced": {
-                "name": "Advanced",
-                "icon": "🌳",
-                "description": "Complex reasoning with minimal hand-holding", 
-                "complexity": 3,
-                "max_sentence_length": 40,
-                "use_examples": False,
-                "use_analogies": False,
-                "scaffolding": False
-            }
-        }
+        self.RAG_SETTINGS = RAG_SETTINGS
+        self.LEARNING_LEVELS = LEARNING_LEVELS
     
-    def get_language_info(self, lang_code: str) -> Dict:
+    def get_language_info(self, lang_code: str) -> Mapping:
         """Get language information by code"""
         return self.LANGUAGE_MAPPINGS.get(lang_code, self.LANGUAGE_MAPPINGS["en"])
     
@@ -171,9 +177,9 @@ class AppConfig:
     
     def is_language_supported(self, lang_code: str) -> bool:
         """Check if language is supported"""
-        return lang_code in self.SUPPORTED_LANGUAGES
+        return lang_code in self._SUPPORTED_LANGUAGES_SET
     
-    def get_learning_level_info(self, level: str) -> Dict:
+    def get_learning_level_info(self, level: str) -> Mapping:
         """Get learning level information"""
         return self.LEARNING_LEVELS.get(level, self.LEARNING_LEVELS["beginner"])
     
@@ -183,32 +189,16 @@ class AppConfig:
     
     def validate_config(self) -> List[str]:
         """Validate configuration and return any issues"""
-        issues = []
-        
-        # Check required API keys
-        if not self.GROQ_API_KEY:
-            issues.append("GROQ_API_KEY is required")
-        
-        # Check Supabase configuration
-        if not self.SUPABASE_URL:
-            issues.append("SUPABASE_URL is required")
-        
-        if not self.SUPABASE_KEY:
-            issues.append("SUPABASE_KEY is required")
-        
-        # Check file upload settings
-        if self.MAX_FILE_SIZE <= 0:
-            issues.append("MAX_FILE_SIZE must be positive")
-        
-        if not self.ALLOWED_EXTENSIONS:
-            issues.append("ALLOWED_EXTENSIONS cannot be empty")
-        
-        # Check language settings
-        for lang in self.SUPPORTED_LANGUAGES:
-            if lang not in self.LANGUAGE_MAPPINGS:
-                issues.append(f"Language {lang} not found in mappings")
-        
-        return issues
+        # Only presence of the keys matters, so the secrets stay out of the cache
+        return list(_validate_settings(
+            bool(self.GROQ_API_KEY),
+            bool(self.SUPABASE_URL),
+            bool(self.SUPABASE_KEY),
+            self.MAX_FILE_SIZE,
+            tuple(self.ALLOWED_EXTENSIONS),
+            tuple(self.SUPPORTED_LANGUAGES),
+            frozenset(self.LANGUAGE_MAPPINGS)
+        ))
     
     def get_config_summary(self) -> Dict:
         """Get configuration summary for debugging"""
@@ -219,7 +209,7 @@ class AppConfig:
             "supported_languages": len(self.SUPPORTED_LANGUAGES),
             "voice_enabled": self.VOICE_ENABLED,
             "max_file_size": self.MAX_FILE_SIZE,
-            "rag_settings": self.RAG_SETTINGS,
+            "rag_settings": dict(self.RAG_SETTINGS),
             "validation_issues": self.validate_config()
         }
     
@@ -227,6 +217,8 @@ class AppConfig:
         """Update a configuration setting"""
         if hasattr(self, setting_name.upper()):
             setattr(self, setting_name.upper(), value)
+            if setting_name.upper() == "SUPPORTED_LANGUAGES":
+                self._SUPPORTED_LANGUAGES_SET = frozenset(self.SUPPORTED_LANGUAGES)
         else:
             raise ValueError(f"Unknown setting: {setting_name}")
     
@@ -242,6 +234,12 @@ class AppConfig:
             "voice_enabled": self.VOICE_ENABLED,
             "max_file_size": self.MAX_FILE_SIZE,
             "allowed_extensions": self.ALLOWED_EXTENSIONS,
-            "rag_settings": self.RAG_SETTINGS,
-            "learning_levels": self.LEARNING_LEVELS
+            "rag_settings": dict(self.RAG_SETTINGS),
+            "learning_levels": {level: dict(info) for level, info in self.LEARNING_LEVELS.items()}
         }
+
+
+@lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """Process-wide AppConfig; the environment is read on first call only"""
+    return AppConfig()
@@ -0,0 +1,126 @@
+"""
+Redis Configuration for Yeneta Platform
+Shared cache connection used to reuse expensive results across processes
+"""
+
+import json
+import random
+import logging
+from typing import Any, Dict, Mapping, Optional
+import streamlit as st
+
+from .app_config import get_config
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Every Yeneta cache key lives under this prefix
+KEY_PREFIX = "yeneta:"
+# Entries written together expire up to this fraction of their TTL apart
+TTL_JITTER = 0.1
+# A cache that is slower than recomputing is worse than none
+SOCKET_TIMEOUT_SECONDS = 0.5
+
+@st.cache_resource(show_spinner=False)
+def get_redis():
+    """
+    Process-wide Redis client backed by a connection pool, or None when
+    redis-py is missing or the server is unreachable at startup
+    """
+    if not REDIS_AVAILABLE:
+        return None
+    try:
+        client = redis.Redis.from_url(
+            get_config().REDIS_URL,
+            socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+            socket_timeout=SOCKET_TIMEOUT_SECONDS,
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        logger.warning(f"Redis unavailable, caching stays in-process: {e}")
+        return None
+
+def jittered_ttl(ttl: int) -> int:
+    """TTL randomly shortened by up to TTL_JITTER so batches don't expire at once"""
+    return max(1, int(ttl * (1 - random.random() * TTL_JITTER)))
+
+def cache_get(key: str) -> Optional[bytes]:
+    """Cached value for key, or None on a miss or any Redis error"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return client.get(KEY_PREFIX + key)
+    except Exception as e:
+        logger.warning(f"Redis GET failed for {key}: {e}")
+        return None
+
+def cache_set(key: str, value, ttl: Optional[int] = None) -> bool:
+    """Store value under key with a jittered TTL (CACHE_TTL by default)"""
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        client.setex(KEY_PREFIX + key, jittered_ttl(ttl or get_config().CACHE_TTL), value)
+        return True
+    except Exception as e:
+        logger.warning(f"Redis SETEX failed for {key}: {e}")
+        return False
+
+def _profile_key(user_id: str) -> str:
+    return f"{KEY_PREFIX}user:{user_id}"
+
+def cache_profile(user_id: str, profile: Mapping[str, Any]) -> bool:
+    """Store a user profile as a Redis hash that lives for CACHE_TTL"""
+    client = get_redis()
+    if client is None:
+        return False
+    key = _profile_key(user_id)
+    # Hash values are bytes; JSON-encode each one so types (and None) survive
+    fields = {name: json.dumps(value, default=str) for name, value in profile.items()}
+    if not fields:
+        return False
+    try:
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, jittered_ttl(get_config().CACHE_TTL))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis profile write failed for {user_id}: {e}")
+        return False
+    return True
+
+def get_cached_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    """Cached profile fields for user_id, or None on a miss or any Redis error"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        fields = client.hgetall(_profile_key(user_id))
+    except Exception as e:
+        logger.warning(f"Redis HGETALL failed for {user_id}: {e}")
+        return None
+    if not fields:
+        return None
+    try:
+        return {name.decode(): json.loads(value) for name, value in fields.items()}
+    except ValueError:
+        # Written in an older format; treat as a miss and let it be rewritten
+        return None
+
+def invalidate_profile(user_id: str) -> None:
+    """Drop the cached profile so the next read goes to Supabase"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(_profile_key(user_id))
+    except Exception as e:
+        logger.warning(f"Redis DEL failed for {user_id}: {e}")
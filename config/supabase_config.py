@@ -5,28 +5,152 @@ Handles authentication, database operations, and real-time features
 
 import os
 import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import streamlit as st
 
+from .redis_config import KEY_PREFIX, cache_profile, get_cached_profile, get_redis, invalidate_profile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 try:
     from supabase import create_client, Client
+    from postgrest.exceptions import APIError
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
     st.warning("Supabase not available. Install: pip install supabase")
 
+logger = logging.getLogger(__name__)
+
+def _dumps_event(record: Dict[str, Any]) -> bytes:
+    """Serialize a queued analytics event (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(record, default=str)
+    return json.dumps(record, default=str).encode("utf-8")
+
+_loads_event = orjson.loads if orjson is not None else json.loads
+
+# Analytics events are buffered in this Redis list and inserted in batches
+ANALYTICS_QUEUE_KEY = KEY_PREFIX + "events"
+# Events Supabase rejected on their own, kept for inspection and replay
+ANALYTICS_DEAD_KEY = KEY_PREFIX + "events:dead"
+# Flush once this many events are queued...
+ANALYTICS_BATCH_SIZE = 500
+# ...or at least this often
+ANALYTICS_FLUSH_SECONDS = 30
+# Longest wait between flushes while Supabase is unreachable
+ANALYTICS_MAX_BACKOFF_SECONDS = 600
+
+# Columns read back by the getters; select("*") would also ship password_hash
+# and any column added later
+PROFILE_COLUMNS = "id,email,full_name,preferred_language,learning_level"
+CONVERSATION_COLUMNS = "id,title,language,learning_level,created_at,updated_at"
+MESSAGE_COLUMNS = "id,role,content,language,created_at"
+
+def _make_client(url: str, key: str) -> "Client":
+    """
+    Supabase client for the current browser session, reused across its reruns.
+
+    Signing in stores the user's JWT on the client, so a client must never be
+    shared between sessions: RLS would see whoever signed in last.
+    """
+    clients = st.session_state.setdefault("_supabase_clients", {})
+    client = clients.get((url, key))
+    if client is None:
+        client = clients[(url, key)] = create_client(url, key)
+    return client
+
+@st.cache_resource(show_spinner=False)
+def _make_service_client(url: str, service_key: str) -> "Client":
+    """
+    Process-wide service-role client for the event flusher, whose batches mix
+    several users' rows; it bypasses RLS and must never sign in
+    """
+    return create_client(url, service_key)
+
+def _flush_events(client, max_events: int = ANALYTICS_BATCH_SIZE) -> int:
+    """Move up to max_events queued analytics events into Supabase; returns how many"""
+    redis_client = get_redis()
+    if redis_client is None:
+        return 0
+    # Take the batch off the queue atomically so concurrent flushers never share events
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.lrange(ANALYTICS_QUEUE_KEY, 0, max_events - 1)
+    pipe.ltrim(ANALYTICS_QUEUE_KEY, max_events, -1)
+    batch, _ = pipe.execute()
+    if not batch:
+        return 0
+    try:
+        client.table("analytics_events").insert([_loads_event(raw) for raw in batch]).execute()
+        return len(batch)
+    except (APIError, ValueError) as e:
+        # Supabase (or the decoder) rejected some row; find which one(s)
+        logger.warning(f"Batched analytics insert rejected, retrying one by one: {e}")
+    except Exception:
+        # Transport failure: nothing was written, so retry this batch first
+        redis_client.lpush(ANALYTICS_QUEUE_KEY, *reversed(batch))
+        raise
+
+    dead = []
+    try:
+        for n, raw in enumerate(batch):
+            try:
+                client.table("analytics_events").insert(_loads_event(raw)).execute()
+            except (APIError, ValueError):
+                dead.append(raw)
+            except Exception:
+                # Lost the connection part way: requeue the rest, in order
+                redis_client.lpush(ANALYTICS_QUEUE_KEY, *reversed(batch[n:]))
+                raise
+    finally:
+        if dead:
+            redis_client.rpush(ANALYTICS_DEAD_KEY, *dead)
+            logger.warning(f"Moved {len(dead)} rejected analytics events to {ANALYTICS_DEAD_KEY}")
+    return len(batch) - len(dead)
+
+@st.cache_resource(show_spinner=False)
+def _start_event_flusher(url: str, service_key: str) -> threading.Thread:
+    """Background thread (one per process) that flushes the event queue periodically"""
+    client = _make_service_client(url, service_key)
+
+    def run():
+        delay = ANALYTICS_FLUSH_SECONDS
+        while True:
+            time.sleep(delay)
+            try:
+                while _flush_events(client) == ANALYTICS_BATCH_SIZE:
+                    pass
+                delay = ANALYTICS_FLUSH_SECONDS
+            except Exception as e:
+                # Supabase unreachable: back off instead of retrying every cycle
+                delay = min(delay * 2, ANALYTICS_MAX_BACKOFF_SECONDS)
+                logger.warning(f"Analytics flush failed, next attempt in {delay}s: {e}")
+
+    thread = threading.Thread(target=run, name="yeneta-analytics-flush", daemon=True)
+    thread.start()
+    return thread
+
 class SupabaseConfig:
     """Supabase configuration and database operations"""
     
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL", "your-supabase-url")
         self.key = os.getenv("SUPABASE_ANON_KEY", "your-supabase-anon-key")
+        # Needed to batch analytics events; without it they are inserted directly
+        self.service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         self.client = None
         
         if SUPABASE_AVAILABLE and self.url != "your-supabase-url":
             try:
-                self.client = create_client(self.url, self.key)
+                self.client = _make_client(self.url, self.key)
             except Exception as e:
                 st.error(f"Failed to connect to Supabase: {e}")
     
@@ -84,8 +208,7 @@ class SupabaseConfig:
                     "email": email,
                     "full_name": full_name,
                     "preferred_language": "en",
-                    "learning_level": "beginner",
-                    "created_at": datetime.now().isoformat()
+                    "learning_level": "beginner"
                 }
                 
                 self.client.table("users").insert(profile_data).execute()
@@ -109,10 +232,15 @@ class SupabaseConfig:
         if not self.is_connected():
             return {"success": False, "error": "Supabase not connected"}
         
+        cached = get_cached_profile(user_id)
+        if cached:
+            return {"success": True, "profile": cached}
+        
         try:
-            response = self.client.table("users").select("*").eq("id", user_id).execute()
+            response = self.client.table("users").select(PROFILE_COLUMNS).eq("id", user_id).execute()
             
             if response.data:
+                cache_profile(user_id, response.data[0])
                 return {"success": True, "profile": response.data[0]}
             else:
                 return {"success": False, "error": "User not found"}
@@ -127,6 +255,7 @@ class SupabaseConfig:
         
         try:
             response = self.client.table("users").update(updates).eq("id", user_id).execute()
+            invalidate_profile(user_id)
             return {"success": True, "data": response.data}
             
         except Exception as e:
@@ -141,8 +270,7 @@ class SupabaseConfig:
             conversation_data = {
                 "user_id": user_id,
                 "title": title,
-                "language": language,
-                "created_at": datetime.now().isoformat()
+                "language": language
             }
             
             response = self.client.table("conversations").insert(conversation_data).execute()
@@ -162,8 +290,7 @@ class SupabaseConfig:
                 "user_id": user_id,
                 "role": role,
                 "content": content,
-                "language": language,
-                "created_at": datetime.now().isoformat()
+                "language": language
             }
             
             response = self.client.table("messages").insert(message_data).execute()
@@ -172,14 +299,22 @@ class SupabaseConfig:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def get_conversation_messages(self, conversation_id: str) -> Dict[str, Any]:
-        """Get all messages for a conversation"""
+    def get_conversation_messages(self, conversation_id: str, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """Get one page of a conversation's messages, oldest first
+        
+        next_offset is the offset of the following page, or None on the last one
+        """
         if not self.is_connected():
             return {"success": False, "error": "Supabase not connected"}
         
         try:
-            response = self.client.table("messages").select("*").eq("conversation_id", conversation_id).order("created_at").execute()
-            return {"success": True, "messages": response.data}
+            # Ask for one extra row to learn whether another page exists
+            response = (self.client.table("messages").select(MESSAGE_COLUMNS)
+                        .eq("conversation_id", conversation_id).order("created_at")
+                        .range(offset, offset + limit).execute())
+            messages = response.data[:limit]
+            next_offset = offset + limit if len(response.data) > limit else None
+            return {"success": True, "messages": messages, "next_offset": next_offset}
             
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -190,7 +325,7 @@ class SupabaseConfig:
             return {"success": False, "error": "Supabase not connected"}
         
         try:
-            response = self.client.table("conversations").select("*").eq("user_id", user_id).order("updated_at", desc=True).execute()
+            response = self.client.table("conversations").select(CONVERSATION_COLUMNS).eq("user_id", user_id).order("updated_at", desc=True).execute()
             return {"success": True, "conversations": response.data}
             
         except Exception as e:
@@ -202,25 +337,14 @@ class SupabaseConfig:
             return {"success": False, "error": "Supabase not connected"}
         
         try:
-            # Check if progress record exists
-            existing = self.client.table("learning_progress").select("*").eq("user_id", user_id).eq("subject", subject).eq("topic", topic).execute()
-            
-            if existing.data:
-                # Update existing record
-                response = self.client.table("learning_progress").update({
-                    "proficiency_level": proficiency_level,
-                    "updated_at": datetime.now().isoformat()
-                }).eq("user_id", user_id).eq("subject", subject).eq("topic", topic).execute()
-            else:
-                # Create new record
-                progress_data = {
-                    "user_id": user_id,
-                    "subject": subject,
-                    "topic": topic,
-                    "proficiency_level": proficiency_level,
-                    "created_at": datetime.now().isoformat()
-                }
-                response = self.client.table("learning_progress").insert(progress_data).execute()
+            # Single-statement insert-or-update on (user_id, subject, topic);
+            # created_at/updated_at come from the column default and trigger
+            response = self.client.table("learning_progress").upsert({
+                "user_id": user_id,
+                "subject": subject,
+                "topic": topic,
+                "proficiency_level": proficiency_level
+            }, on_conflict="user_id,subject,topic").execute()
             
             return {"success": True, "data": response.data}
             
@@ -240,6 +364,37 @@ class SupabaseConfig:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def load_dashboard(self, user_id: str) -> Dict[str, Any]:
+        """Fetch profile, conversations and dashboard stats concurrently"""
+        if not self.is_connected():
+            return {"success": False, "error": "Supabase not connected"}
+        
+        # Each call is a blocking HTTP round trip; overlapping them makes the
+        # wall time the slowest call rather than the sum of all three
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="yeneta-dashboard") as pool:
+            profile = pool.submit(self.get_user_profile, user_id)
+            conversations = pool.submit(self.get_user_conversations, user_id)
+            dashboard = pool.submit(self.get_user_dashboard, user_id)
+            results = {
+                "profile": profile.result(),
+                "conversations": conversations.result(),
+                "dashboard": dashboard.result()
+            }
+        
+        return {"success": all(r["success"] for r in results.values()), **results}
+    
+    def get_user_bundle(self) -> Dict[str, Any]:
+        """Get the signed-in user's conversations, recent messages and learning progress in one call"""
+        if not self.is_connected():
+            return {"success": False, "error": "Supabase not connected"}
+        
+        try:
+            response = self.client.rpc("get_user_bundle", {}).execute()
+            return {"success": True, "bundle": response.data}
+            
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
     def add_achievement(self, user_id: str, achievement_type: str, achievement_name: str, description: str, points: int = 0) -> Dict[str, Any]:
         """Add user achievement"""
         if not self.is_connected():
@@ -251,8 +406,7 @@ class SupabaseConfig:
                 "achievement_type": achievement_type,
                 "achievement_name": achievement_name,
                 "description": description,
-                "points": points,
-                "earned_at": datetime.now().isoformat()
+                "points": points
             }
             
             response = self.client.table("user_achievements").insert(achievement_data).execute()
@@ -262,7 +416,7 @@ class SupabaseConfig:
             return {"success": False, "error": str(e)}
     
     def log_analytics_event(self, user_id: str, event_type: str, event_data: Dict[str, Any], session_id: str = None) -> Dict[str, Any]:
-        """Log analytics event"""
+        """Log analytics event; queued in Redis for a batched insert when available"""
         if not self.is_connected():
             return {"success": False, "error": "Supabase not connected"}
         
@@ -271,12 +425,40 @@ class SupabaseConfig:
                 "user_id": user_id,
                 "event_type": event_type,
                 "event_data": event_data,
-                "session_id": session_id,
-                "created_at": datetime.now().isoformat()
+                "session_id": session_id
             }
             
+            redis_client = get_redis() if self.service_key else None
+            if redis_client is not None:
+                # Stamp now: the row is written up to ANALYTICS_FLUSH_SECONDS later
+                event_data_record["created_at"] = datetime.now(timezone.utc).isoformat()
+                try:
+                    queued = redis_client.rpush(ANALYTICS_QUEUE_KEY, _dumps_event(event_data_record))
+                except Exception as e:
+                    logger.warning(f"Analytics queue unavailable, inserting directly: {e}")
+                else:
+                    _start_event_flusher(self.url, self.service_key)
+                    if queued >= ANALYTICS_BATCH_SIZE:
+                        self.flush_events()
+                    # Same shape as a direct insert; the row has no id until the flush
+                    return {"success": True, "event": event_data_record, "queued": True}
+            
             response = self.client.table("analytics_events").insert(event_data_record).execute()
             return {"success": True, "event": response.data[0]}
             
         except Exception as e:
             return {"success": False, "error": str(e)}
+    
+    def flush_events(self) -> Dict[str, Any]:
+        """Insert one batch of queued analytics events"""
+        if not self.is_connected():
+            return {"success": False, "error": "Supabase not connected"}
+        if not self.service_key:
+            return {"success": True, "flushed": 0}
+        
+        try:
+            client = _make_service_client(self.url, self.service_key)
+            return {"success": True, "flushed": _flush_events(client)}
+            
+        except Exception as e:
+            return {"success": False, "error": str(e)}
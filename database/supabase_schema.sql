@@ -68,7 +68,8 @@ CREATE TABLE learning_progress (
     time_spent_minutes INTEGER DEFAULT 0,
     last_studied TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(user_id, subject, topic)
 );
 
 -- User achievements table
@@ -328,8 +329,52 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+-- Create a function to load the calling user's conversations, recent messages
+-- and learning progress in one round trip
+CREATE OR REPLACE FUNCTION get_user_bundle()
+RETURNS JSON AS $$
+DECLARE
+    result JSON;
+BEGIN
+    SELECT json_build_object(
+        'conversations', (
+            SELECT COALESCE(json_agg(row_to_json(c) ORDER BY c.updated_at DESC), '[]'::json)
+            FROM (
+                SELECT id, title, language, learning_level, created_at, updated_at
+                FROM conversations
+                WHERE user_id = auth.uid()
+                ORDER BY updated_at DESC
+                LIMIT 20
+            ) c
+        ),
+        'messages', (
+            SELECT COALESCE(json_agg(row_to_json(m) ORDER BY m.created_at), '[]'::json)
+            FROM (
+                SELECT id, role, content, language, created_at
+                FROM messages
+                WHERE user_id = auth.uid()
+                ORDER BY created_at DESC
+                LIMIT 50
+            ) m
+        ),
+        'progress', (
+            SELECT COALESCE(json_agg(row_to_json(lp) ORDER BY lp.updated_at DESC), '[]'::json)
+            FROM (
+                SELECT id, subject, topic, proficiency_level, questions_asked,
+                       correct_answers, time_spent_minutes, last_studied, updated_at
+                FROM learning_progress
+                WHERE user_id = auth.uid()
+            ) lp
+        )
+    ) INTO result;
+    
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY INVOKER;
+
 -- Grant necessary permissions
 GRANT USAGE ON SCHEMA public TO anon, authenticated;
 GRANT ALL ON ALL TABLES IN SCHEMA public TO anon, authenticated;
 GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO anon, authenticated;
 GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA public TO anon, authenticated;
+REVOKE EXECUTE ON FUNCTION get_user_bundle() FROM anon, PUBLIC;
@@ -5,15 +5,236 @@ This module provides comprehensive analytics and insights for student learning
 patterns, performance prediction, and personalized recommendations.
 """
 
+import os
 import json
+import time
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import functools
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from operator import itemgetter
+from types import MappingProxyType
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Any, Mapping, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import logging
-import pandas as pd
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+def __getattr__(name: str):
+    # pandas is only needed by the batch methods, which import it themselves;
+    # keep "advanced_analytics.pd" working for callers without a module-load cost
+    if name == "pd":
+        import pandas
+        return pandas
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Interaction-time columns and the learning style each one indicates, in matching order
+_STYLE_COLUMNS = ["video_watch_time", "text_read_time", "audio_listen_time", "hands_on_activities"]
+_STYLE_NAMES = np.array(["visual", "reading", "auditory", "kinesthetic"])
+
+# Study tips per learning style; shared tuples, so callers must not mutate them
+_STYLE_RECS = {
+    "visual": (
+        "Use diagrams and charts to understand concepts",
+        "Watch educational videos and animations",
+        "Create mind maps and visual notes",
+        "Use color coding in your study materials"
+    ),
+    "auditory": (
+        "Listen to audio lectures and podcasts",
+        "Participate in group discussions",
+        "Record yourself explaining concepts",
+        "Use mnemonic devices and rhymes"
+    ),
+    "reading": (
+        "Read textbooks and written materials",
+        "Take detailed written notes",
+        "Write summaries and explanations",
+        "Use flashcards for memorization"
+    ),
+    "kinesthetic": (
+        "Engage in hands-on activities and experiments",
+        "Use physical models and simulations",
+        "Take frequent breaks to move around",
+        "Practice with real-world applications"
+    ),
+    "mixed": (
+        "Combine videos, reading and hands-on practice",
+        "Notice which study methods help you remember best"
+    )
+}
+
+_LOW_ENGAGEMENT_RECS = (
+    "Try interactive learning activities",
+    "Set up study groups with peers",
+    "Use gamification elements",
+    "Take breaks between study sessions"
+)
+_STEADY_ENGAGEMENT_RECS = ("Continue current engagement strategies",)
+
+# Generated insights are reused for this long per (student_id, time_period)...
+_INSIGHTS_TTL_SECONDS = 300
+# ...for at most this many keys, least recently used dropped first
+_INSIGHTS_CACHE_SIZE = 256
+
+# Risk rules: a student is flagged when the field is below the threshold
+# (missing fields count as zero). The rule's dict is rebuilt per match so
+# callers never share mutable state.
+_RISK_RULES = (
+    ("completion_rate", 0.7, "high", "Low completion rate",
+     "Student is not completing assigned work consistently"),
+    ("average_score", 60, "high", "Low performance scores",
+     "Student is struggling with content comprehension"),
+    ("study_consistency", 0.5, "medium", "Inconsistent study habits",
+     "Student has irregular study patterns"),
+    ("engagement_score", 0.6, "medium", "Low engagement",
+     "Student shows low interest in learning activities")
+)
+
+_RISK_COLUMNS = [rule[0] for rule in _RISK_RULES]
+_RISK_THRESHOLDS = np.array([rule[1] for rule in _RISK_RULES], dtype=np.float32)
+
+def _risk_factor(severity: str, factor: str, description: str) -> Dict[str, str]:
+    return {"factor": factor, "severity": severity, "description": description}
+
+# Cohorts smaller than this are analysed in-process: starting worker
+# processes costs more than the per-student work it would spread out
+_PARALLEL_MIN_STUDENTS = 64
+
+# Fallback results, returned (as fresh copies) when there is nothing to analyse
+# or the analysis fails
+_MIXED_STYLE: Mapping[str, Any] = MappingProxyType({"learning_style": "mixed", "confidence": 0.5})
+_ERR_PERF: Mapping[str, Any] = MappingProxyType({"predicted_exam_score": 0, "confidence_level": 0})
+
+# Cumulative study hours needed to reach each level
+_LEVEL_HOURS = MappingProxyType({
+    "beginner": 0,
+    "intermediate": 40,
+    "advanced": 80
+})
+
+# Score points per attempt the trend line must rise (fall) by to count as
+# improving (declining)
+_TREND_SLOPE = 0.5
+
+# Weights of the performance features: average score, completion %, consistency %,
+# time-per-module headroom, engagement
+_PERF_WEIGHTS = np.array([0.3, 0.25, 0.2, 0.15, 0.1], dtype=np.float32)
+_PERF_COLUMNS = ["average_score", "completion_rate", "study_consistency",
+                 "average_time_per_module", "engagement_score"]
+_W_SCORE, _W_COMPLETION, _W_CONSISTENCY, _W_TIME, _W_ENGAGEMENT = (float(w) for w in _PERF_WEIGHTS)
+
+def _score_kernel(avg_score: float, completion_rate: float, study_consistency: float,
+                  time_per_module: float, engagement_score: float) -> float:
+    """Weighted performance score of one student (the scalar form of features @ _PERF_WEIGHTS)"""
+    headroom = 100.0 - time_per_module
+    headroom = 0.0 if headroom < 0.0 else 100.0 if headroom > 100.0 else headroom
+    return (avg_score * _W_SCORE +
+            completion_rate * 100.0 * _W_COMPLETION +
+            study_consistency * 100.0 * _W_CONSISTENCY +
+            headroom * _W_TIME +
+            engagement_score * _W_ENGAGEMENT)
+
+# Batch paths keep every array float32: scores are 0-100 and shares 0-1, so
+# float64 would only double the bytes each reduction streams through
+def _to_cmatrix(df: "pd.DataFrame", cols: List[str]) -> np.ndarray:
+    """
+    (len(df), len(cols)) float32 matrix of df[cols], missing values and columns
+    as zero. Always C-contiguous: pandas may hand back a column-major block,
+    and the batch methods reduce along rows.
+    """
+    return np.ascontiguousarray(df.reindex(columns=cols, fill_value=0).fillna(0).to_numpy(dtype=np.float32))
+
+@functools.lru_cache(maxsize=8)
+def _efficiency_recommendations(low: bool, slow: bool, high: bool) -> Tuple[str, ...]:
+    recommendations = []
+    
+    if low:
+        recommendations.append("Focus on active learning techniques")
+    
+    if slow:
+        recommendations.append("Break down complex topics into smaller chunks")
+    
+    if high:
+        recommendations.append("Consider advancing to more challenging material")
+    
+    return tuple(recommendations)
+
+@dataclass(slots=True, frozen=True)
+class _StudentView:
+    """
+    The per-student fields the performance helpers read, unpacked from the
+    student data dict once instead of with repeated .get() calls
+    """
+    average_score: float = 0
+    completion_rate: float = 0
+    study_consistency: float = 0
+    average_time_per_module: float = 0
+    engagement_score: float = 0
+    current_level: str = "beginner"
+    target_level: str = "advanced"
+    study_hours_per_week: int = 5
+    recent_scores: Tuple[float, ...] = ()
+    # Non-None entries in the source dict, and consistency with the neutral
+    # 0.5 default that _calculate_confidence uses when it was not reported
+    data_points: int = 0
+    confidence_consistency: float = 0.5
+    
+    @classmethod
+    def of(cls, student_data: Union["_StudentView", Dict[str, Any]]) -> "_StudentView":
+        """View of a student data dict (a view is returned as is)"""
+        if isinstance(student_data, cls):
+            return student_data
+        get = student_data.get
+        return cls(
+            average_score=get("average_score", 0),
+            completion_rate=get("completion_rate", 0),
+            study_consistency=get("study_consistency", 0),
+            average_time_per_module=get("average_time_per_module", 0),
+            engagement_score=get("engagement_score", 0),
+            current_level=get("current_level", "beginner"),
+            target_level=get("target_level", "advanced"),
+            study_hours_per_week=get("study_hours_per_week", 5),
+            recent_scores=tuple(get("recent_scores", ())),
+            data_points=sum(v is not None for v in student_data.values()),
+            confidence_consistency=get("study_consistency", 0.5)
+        )
+
+# Analytics instance of a pool worker process, created on first use
+_worker_analytics = None
+
+def _insights_worker(args: Tuple[str, str]) -> Dict[str, Any]:
+    global _worker_analytics
+    if _worker_analytics is None:
+        _worker_analytics = AdvancedAnalytics()
+    return _worker_analytics.generate_learning_insights(*args)
+
+# Process pool shared by every AdvancedAnalytics in this process, started on
+# the first cohort large enough to use it; spawning workers costs more than a
+# typical cohort's analysis. Each worker is a separate interpreter holding
+# numpy and this module (roughly 50-100 MB) until the server exits, so the
+# pool is capped well below the core count of a large host.
+_POOL_MAX_WORKERS = 4
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=min(_POOL_MAX_WORKERS, os.cpu_count() or 1),
+                                        mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown)
+        return _pool
+
 class AdvancedAnalytics:
     """
     Advanced analytics engine for learning insights, performance prediction,
@@ -24,6 +245,13 @@ class AdvancedAnalytics:
         self.learning_patterns = {}
         self.performance_history = {}
         self.engagement_metrics = {}
+        # Per-instance PCG64 generator for prediction noise (the global RandomState is shared state)
+        self._rng = np.random.default_rng()
+        # (student_id, time_period) -> (monotonic time generated, insights)
+        self._insights_cache = OrderedDict()
+        self._cache_stats = {"hits": 0, "misses": 0}
+        # One instance serves every session (st.cache_resource); guards the two above
+        self._cache_lock = threading.Lock()
         
     def analyze_learning_style(self, interaction_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -44,65 +272,77 @@ class AdvancedAnalytics:
             total_time = video_watch_time + text_read_time + audio_listen_time + hands_on_activities
             
             if total_time == 0:
-                return {"learning_style": "mixed", "confidence": 0.5}
+                return dict(_MIXED_STYLE)
             
-            # Calculate percentages
-            video_pct = video_watch_time / total_time
-            text_pct = text_read_time / total_time
-            audio_pct = audio_listen_time / total_time
-            hands_on_pct = hands_on_activities / total_time
+            # Calculate percentages, in _STYLE_NAMES order
+            pct = np.array([video_watch_time, text_read_time, audio_listen_time, hands_on_activities]) / total_time
             
             # Determine dominant learning style
-            styles = {
-                "visual": video_pct,
-                "reading": text_pct,
-                "auditory": audio_pct,
-                "kinesthetic": hands_on_pct
-            }
-            
-            dominant_style = max(styles, key=styles.get)
-            confidence = max(styles.values())
+            i = int(pct.argmax())
+            dominant_style = str(_STYLE_NAMES[i])
+            confidence = float(pct[i])
             
             return {
                 "learning_style": dominant_style,
                 "confidence": confidence,
-                "style_breakdown": styles,
+                "style_breakdown": dict(zip(_STYLE_NAMES.tolist(), pct.tolist())),
                 "recommendations": self._get_style_recommendations(dominant_style)
             }
             
         except Exception as e:
             logger.error(f"Error analyzing learning style: {e}")
-            return {"learning_style": "mixed", "confidence": 0.5}
+            return dict(_MIXED_STYLE)
+    
+    def analyze_learning_style_batch(self, interactions: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Vectorized learning style analysis for many students at once.
+        
+        Args:
+            interactions: One row per student with the _STYLE_COLUMNS time columns
+                (missing columns count as zero)
+            
+        Returns:
+            DataFrame on the same index with learning_style, confidence and one
+            share column per style; students with no recorded time are "mixed"
+            with confidence 0.5, as in analyze_learning_style
+        """
+        import pandas as pd
+        
+        arr = _to_cmatrix(interactions, _STYLE_COLUMNS)
+        totals = arr.sum(axis=1, keepdims=True)
+        pct = np.divide(arr, totals, out=np.full_like(arr, 0.25), where=totals > 0)
+        dominant = pct.argmax(axis=1)
+        empty = totals[:, 0] == 0
+        
+        result = pd.DataFrame(pct, index=interactions.index, columns=_STYLE_NAMES)
+        result.insert(0, "learning_style", np.where(empty, "mixed", _STYLE_NAMES[dominant]))
+        result.insert(1, "confidence", np.where(empty, np.float32(0.5), pct.max(axis=1)))
+        return result
     
-    def predict_performance(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
+    def predict_performance(self, student_data: Union[Dict[str, Any], _StudentView]) -> Dict[str, Any]:
         """
         Predict student performance based on historical data.
         
         Args:
             student_data: Dictionary containing student performance data
+                (or a _StudentView already built from one)
             
         Returns:
             Dictionary with performance predictions
         """
         try:
             # Extract features
-            avg_score = student_data.get("average_score", 0)
-            completion_rate = student_data.get("completion_rate", 0)
-            study_consistency = student_data.get("study_consistency", 0)
-            time_per_module = student_data.get("average_time_per_module", 0)
-            engagement_score = student_data.get("engagement_score", 0)
+            student_data = _StudentView.of(student_data)
             
             # Simple prediction model (in production, use ML models)
-            performance_score = (
-                avg_score * 0.3 +
-                completion_rate * 100 * 0.25 +
-                study_consistency * 100 * 0.2 +
-                min(100, max(0, 100 - time_per_module)) * 0.15 +
-                engagement_score * 0.1
+            performance_score = _score_kernel(
+                float(student_data.average_score), float(student_data.completion_rate),
+                float(student_data.study_consistency), float(student_data.average_time_per_module),
+                float(student_data.engagement_score)
             )
             
             # Predict exam performance
-            exam_prediction = min(100, max(0, performance_score + np.random.normal(0, 5)))
+            exam_prediction = float(np.clip(performance_score + self._rng.standard_normal() * 5, 0.0, 100.0))
             
             # Predict time to mastery
             time_to_mastery = self._calculate_time_to_mastery(student_data)
@@ -121,7 +361,30 @@ class AdvancedAnalytics:
             
         except Exception as e:
             logger.error(f"Error predicting performance: {e}")
-            return {"predicted_exam_score": 0, "confidence_level": 0}
+            return dict(_ERR_PERF)
+    
+    def predict_performance_batch(self, students: "pd.DataFrame") -> "pd.Series":
+        """
+        Vectorized predicted exam scores for many students at once.
+        
+        Args:
+            students: One row per student with the predict_performance feature
+                columns (missing columns count as zero)
+            
+        Returns:
+            Series of predicted exam scores on the same index
+        """
+        import pandas as pd
+        
+        # Raw columns in _PERF_COLUMNS order, turned into the weighted features in place
+        features = _to_cmatrix(students, _PERF_COLUMNS)
+        features[:, 1:3] *= 100
+        np.clip(np.float32(100) - features[:, 3], 0, 100, out=features[:, 3])
+        scores = features @ _PERF_WEIGHTS
+        # All N noise samples in one draw; the clamp reuses the score buffer
+        scores += self._rng.standard_normal(len(students), dtype=np.float32) * np.float32(5)
+        np.clip(scores, 0, 100, out=scores)
+        return pd.Series(scores.round(1), index=students.index, name="predicted_exam_score")
     
     def analyze_weakness_patterns(self, performance_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -141,23 +404,68 @@ class AdvancedAnalytics:
             # Analyze common error types
             error_analysis = self._analyze_error_patterns(error_patterns)
             
-            # Identify struggling topics
-            struggling_topics = self._identify_struggling_topics(weak_areas, time_spent)
+            return self._weakness_report(weak_areas, time_spent, error_analysis)
+            
+        except Exception as e:
+            logger.error(f"Error analyzing weakness patterns: {e}")
+            return {"struggling_topics": [], "error_patterns": {}}
+    
+    def analyze_weakness_patterns_cohort(self, records: "pd.DataFrame") -> Dict[Any, Dict[str, Any]]:
+        """
+        Weakness analysis for a whole cohort from one long-format table.
+        
+        Args:
+            records: One row per observation with student_id, topic, time_spent
+                and error_type columns; topic or error_type may be empty
+            
+        Returns:
+            Dictionary of student_id -> analyze_weakness_patterns result, where
+            each student's weak areas are the topics they have rows for
+        """
+        try:
+            # Long-format group sizes/sums only: unstacking to a student x error
+            # matrix would materialize every combination
+            errors = (records.dropna(subset=["error_type"])
+                      .groupby(["student_id", "error_type"], sort=False, observed=True).size())
+            times = (records.dropna(subset=["topic"])
+                     .groupby(["student_id", "topic"], sort=False, observed=True)["time_spent"].sum())
             
-            # Generate intervention strategies
-            interventions = self._generate_interventions(struggling_topics, error_analysis)
+            error_counts: Dict[Any, Dict[str, int]] = {}
+            for (student_id, error_type), count in zip(errors.index, errors.tolist()):
+                error_counts.setdefault(student_id, {})[error_type] = count
+            topic_times: Dict[Any, Dict[str, Any]] = {}
+            for (student_id, topic), spent in zip(times.index, times.tolist()):
+                topic_times.setdefault(student_id, {})[topic] = spent
             
             return {
-                "struggling_topics": struggling_topics,
-                "error_patterns": error_analysis,
-                "intervention_strategies": interventions,
-                "priority_areas": self._prioritize_areas(struggling_topics),
-                "estimated_improvement_time": self._estimate_improvement_time(struggling_topics)
+                student_id: self._weakness_report(
+                    list(topic_times.get(student_id, {})),
+                    topic_times.get(student_id, {}),
+                    error_counts.get(student_id, {})
+                )
+                for student_id in records["student_id"].unique().tolist()
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing weakness patterns: {e}")
-            return {"struggling_topics": [], "error_patterns": {}}
+            logger.error(f"Error analyzing cohort weakness patterns: {e}")
+            return {}
+    
+    def _weakness_report(self, weak_areas: List[str], time_spent: Dict[str, Any],
+                         error_analysis: Dict[str, int]) -> Dict[str, Any]:
+        """Assemble a weakness analysis from weak areas, their study time and error counts"""
+        # Identify struggling topics
+        struggling_topics = self._identify_struggling_topics(weak_areas, time_spent)
+        
+        # Generate intervention strategies
+        interventions = self._generate_interventions(struggling_topics, error_analysis)
+        
+        return {
+            "struggling_topics": struggling_topics,
+            "error_patterns": error_analysis,
+            "intervention_strategies": interventions,
+            "priority_areas": self._prioritize_areas(struggling_topics),
+            "estimated_improvement_time": self._estimate_improvement_time(struggling_topics)
+        }
     
     def generate_learning_insights(self, student_id: str, time_period: str = "30d") -> Dict[str, Any]:
         """
@@ -168,8 +476,18 @@ class AdvancedAnalytics:
             time_period: Time period for analysis (7d, 30d, 90d)
             
         Returns:
-            Dictionary with comprehensive learning insights
+            Dictionary with comprehensive learning insights; cached results are
+            shared between callers and must not be mutated
         """
+        key = (student_id, time_period)
+        with self._cache_lock:
+            cached = self._insights_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < _INSIGHTS_TTL_SECONDS:
+                self._insights_cache.move_to_end(key)
+                self._cache_stats["hits"] += 1
+                return cached[1]
+            self._cache_stats["misses"] += 1
+        
         try:
             # Get student data
             student_data = self._get_student_data(student_id, time_period)
@@ -177,17 +495,20 @@ class AdvancedAnalytics:
             # Learning style analysis
             learning_style = self.analyze_learning_style(student_data.get("interaction_data", {}))
             
+            # Fields shared by the performance/engagement/efficiency helpers, read once
+            view = _StudentView.of(student_data)
+            
             # Performance prediction
-            performance_prediction = self.predict_performance(student_data)
+            performance_prediction = self.predict_performance(view)
             
             # Weakness analysis
             weakness_analysis = self.analyze_weakness_patterns(student_data)
             
             # Engagement analysis
-            engagement_analysis = self._analyze_engagement(student_data)
+            engagement_analysis = self._analyze_engagement(view)
             
             # Learning efficiency
-            efficiency_analysis = self._analyze_learning_efficiency(student_data)
+            efficiency_analysis = self._analyze_learning_efficiency(view)
             
             # Generate recommendations
             recommendations = self._generate_comprehensive_recommendations(
@@ -195,7 +516,7 @@ class AdvancedAnalytics:
                 engagement_analysis, efficiency_analysis
             )
             
-            return {
+            insights = {
                 "student_id": student_id,
                 "analysis_period": time_period,
                 "generated_at": datetime.now().isoformat(),
@@ -210,154 +531,210 @@ class AdvancedAnalytics:
                 )
             }
             
+            # Errors fall through to the except below and are never cached
+            with self._cache_lock:
+                self._insights_cache[key] = (time.monotonic(), insights)
+                self._insights_cache.move_to_end(key)
+                if len(self._insights_cache) > _INSIGHTS_CACHE_SIZE:
+                    self._insights_cache.popitem(last=False)
+            return insights
+            
         except Exception as e:
             logger.error(f"Error generating learning insights: {e}")
             return {"error": str(e)}
     
-    def _get_style_recommendations(self, learning_style: str) -> List[str]:
-        """Get recommendations based on learning style."""
-        recommendations = {
-            "visual": [
-                "Use diagrams and charts to understand concepts",
-                "Watch educational videos and animations",
-                "Create mind maps and visual notes",
-                "Use color coding in your study materials"
-            ],
-            "auditory": [
-                "Listen to audio lectures and podcasts",
-                "Participate in group discussions",
-                "Record yourself explaining concepts",
-                "Use mnemonic devices and rhymes"
-            ],
-            "reading": [
-                "Read textbooks and written materials",
-                "Take detailed written notes",
-                "Write summaries and explanations",
-                "Use flashcards for memorization"
-            ],
-            "kinesthetic": [
-                "Engage in hands-on activities and experiments",
-                "Use physical models and simulations",
-                "Take frequent breaks to move around",
-                "Practice with real-world applications"
-            ]
+    def generate_learning_insights_many(self, student_ids: List[str], time_period: str = "30d") -> Dict[str, Dict[str, Any]]:
+        """
+        Learning insights for a whole cohort, keyed by student id.
+        
+        Cached students are served from this instance; the rest are analysed
+        across a process pool when there are enough of them to pay for it.
+        """
+        results = {}
+        missing = []
+        now = time.monotonic()
+        with self._cache_lock:
+            for student_id in dict.fromkeys(student_ids):
+                key = (student_id, time_period)
+                cached = self._insights_cache.get(key)
+                if cached is not None and now - cached[0] < _INSIGHTS_TTL_SECONDS:
+                    self._insights_cache.move_to_end(key)
+                    self._cache_stats["hits"] += 1
+                    results[student_id] = cached[1]
+                else:
+                    missing.append(student_id)
+        
+        if len(missing) < _PARALLEL_MIN_STUDENTS:
+            for student_id in missing:
+                results[student_id] = self.generate_learning_insights(student_id, time_period)
+            return results
+        
+        workers = min(_POOL_MAX_WORKERS, os.cpu_count() or 1, len(missing))
+        insights = list(_get_pool().map(_insights_worker, [(student_id, time_period) for student_id in missing],
+                                        chunksize=max(1, len(missing) // (workers * 4))))
+        
+        with self._cache_lock:
+            self._cache_stats["misses"] += len(missing)
+            now = time.monotonic()
+            for student_id, result in zip(missing, insights):
+                results[student_id] = result
+                if "error" not in result:
+                    self._insights_cache[(student_id, time_period)] = (now, result)
+                    self._insights_cache.move_to_end((student_id, time_period))
+            while len(self._insights_cache) > _INSIGHTS_CACHE_SIZE:
+                self._insights_cache.popitem(last=False)
+        return results
+    
+    def clear_insights_cache(self, student_id: Optional[str] = None):
+        """Drop cached insights for one student (all periods), or for everyone"""
+        with self._cache_lock:
+            if student_id is None:
+                self._insights_cache.clear()
+                return
+            for key in [key for key in self._insights_cache if key[0] == student_id]:
+                self._insights_cache.pop(key, None)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Insights cache hits, misses, hit rate and current size"""
+        with self._cache_lock:
+            hits, misses = self._cache_stats["hits"], self._cache_stats["misses"]
+            size = len(self._insights_cache)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "size": size
         }
-        return recommendations.get(learning_style, recommendations["mixed"])
     
-    def _calculate_time_to_mastery(self, student_data: Dict[str, Any]) -> int:
+    @staticmethod
+    def _get_style_recommendations(learning_style: str) -> Tuple[str, ...]:
+        """Get recommendations based on learning style."""
+        return _STYLE_RECS.get(learning_style, _STYLE_RECS["mixed"])
+    
+    def _calculate_time_to_mastery(self, student_data: _StudentView) -> int:
         """Calculate estimated time to mastery in weeks."""
-        current_level = student_data.get("current_level", "beginner")
-        target_level = student_data.get("target_level", "advanced")
-        study_hours_per_week = student_data.get("study_hours_per_week", 5)
-        
-        level_hours = {
-            "beginner": 0,
-            "intermediate": 40,
-            "advanced": 80
-        }
+        current_level = student_data.current_level
+        target_level = student_data.target_level
+        study_hours_per_week = student_data.study_hours_per_week
         
-        current_hours = level_hours.get(current_level, 0)
-        target_hours = level_hours.get(target_level, 80)
+        current_hours = _LEVEL_HOURS.get(current_level, 0)
+        target_hours = _LEVEL_HOURS.get(target_level, 80)
         
         remaining_hours = target_hours - current_hours
-        return max(1, remaining_hours // study_hours_per_week)
+        # Round up: a partial week of study is still a week
+        return max(1, -(-remaining_hours // study_hours_per_week))
     
-    def _assess_risk_factors(self, student_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _assess_risk_factors(self, student_data: _StudentView) -> List[Dict[str, Any]]:
         """Assess risk factors for student success."""
-        risk_factors = []
-        
-        if student_data.get("completion_rate", 0) < 0.7:
-            risk_factors.append({
-                "factor": "Low completion rate",
-                "severity": "high",
-                "description": "Student is not completing assigned work consistently"
-            })
-        
-        if student_data.get("average_score", 0) < 60:
-            risk_factors.append({
-                "factor": "Low performance scores",
-                "severity": "high",
-                "description": "Student is struggling with content comprehension"
-            })
-        
-        if student_data.get("study_consistency", 0) < 0.5:
-            risk_factors.append({
-                "factor": "Inconsistent study habits",
-                "severity": "medium",
-                "description": "Student has irregular study patterns"
-            })
-        
-        if student_data.get("engagement_score", 0) < 0.6:
-            risk_factors.append({
-                "factor": "Low engagement",
-                "severity": "medium",
-                "description": "Student shows low interest in learning activities"
-            })
+        return [
+            _risk_factor(severity, factor, description)
+            for key, threshold, severity, factor, description in _RISK_RULES
+            if getattr(student_data, key) < threshold
+        ]
+    
+    def assess_risk_factors_batch(self, students: "pd.DataFrame") -> List[List[Dict[str, Any]]]:
+        """
+        Risk factors for many students at once, one list per row in order.
         
+        All rules are evaluated as one vectorized comparison over the
+        students' rule columns instead of one Python branch per student.
+        """
+        risk_factors = [[] for _ in range(len(students))]
+        # (N, rules) mask in one comparison; thresholds are float32 like the
+        # data, so a value equal to one is not flagged
+        mask = _to_cmatrix(students, _RISK_COLUMNS) < _RISK_THRESHOLDS
+        # Row-major nonzero keeps each student's rules in table order
+        for row, rule in zip(*np.nonzero(mask)):
+            _, _, severity, factor, description = _RISK_RULES[rule]
+            risk_factors[row].append(_risk_factor(severity, factor, description))
         return risk_factors
     
-    def _calculate_confidence(self, student_data: Dict[str, Any]) -> float:
+    def _calculate_confidence(self, student_data: _StudentView) -> float:
         """Calculate confidence level for predictions."""
-        data_points = len([v for v in student_data.values() if v is not None])
-        consistency = student_data.get("study_consistency", 0.5)
+        data_points = student_data.data_points
+        consistency = student_data.confidence_consistency
         
         # More data points and higher consistency = higher confidence
         confidence = min(0.95, (data_points / 10) * 0.5 + consistency * 0.5)
         return round(confidence, 2)
     
-    def _analyze_performance_trend(self, student_data: Dict[str, Any]) -> str:
+    def _analyze_performance_trend(self, student_data: _StudentView) -> str:
         """Analyze performance trend over time."""
-        recent_scores = student_data.get("recent_scores", [])
-        if len(recent_scores) < 2:
+        recent = np.asarray(student_data.recent_scores, dtype=np.float32)
+        if recent.size < 2:
             return "insufficient_data"
         
-        # Simple trend analysis
-        if recent_scores[-1] > recent_scores[0]:
+        # Least-squares slope over every score, not just first vs last
+        slope = recent[1] - recent[0] if recent.size == 2 else np.polyfit(np.arange(recent.size), recent, 1)[0]
+        if slope > _TREND_SLOPE:
             return "improving"
-        elif recent_scores[-1] < recent_scores[0]:
+        elif slope < -_TREND_SLOPE:
             return "declining"
         else:
             return "stable"
     
-    def _generate_performance_recommendations(self, student_data: Dict[str, Any]) -> List[str]:
+    def analyze_performance_trend_batch(self, recent_scores: np.ndarray) -> np.ndarray:
+        """
+        Trend labels for many students with equally long score histories.
+        
+        Args:
+            recent_scores: (N, T) array, one row of T scores per student
+            
+        Returns:
+            Array of N labels as in _analyze_performance_trend
+        """
+        y = np.ascontiguousarray(recent_scores, dtype=np.float32)
+        n, t = y.shape
+        if t < 2:
+            return np.full(n, "insufficient_data")
+        # Closed-form least-squares slope for every row at once, x = 0..t-1
+        x = np.arange(t, dtype=np.float32)
+        slope = (t * (y @ x) - x.sum() * y.sum(axis=1)) / (t * (x @ x) - x.sum() ** 2)
+        return np.where(slope > _TREND_SLOPE, "improving",
+                        np.where(slope < -_TREND_SLOPE, "declining", "stable"))
+    
+    def _generate_performance_recommendations(self, student_data: _StudentView) -> List[str]:
         """Generate performance-based recommendations."""
         recommendations = []
         
-        if student_data.get("average_score", 0) < 70:
+        if student_data.average_score < 70:
             recommendations.append("Focus on foundational concepts before advancing")
         
-        if student_data.get("completion_rate", 0) < 0.8:
+        if student_data.completion_rate < 0.8:
             recommendations.append("Set up a consistent study schedule")
         
-        if student_data.get("time_per_module", 0) > 15:
+        if student_data.average_time_per_module > 15:
             recommendations.append("Break down complex topics into smaller chunks")
         
-        if student_data.get("engagement_score", 0) < 0.6:
+        if student_data.engagement_score < 0.6:
             recommendations.append("Try different learning methods to increase engagement")
         
         return recommendations
     
     def _analyze_error_patterns(self, error_patterns: List[str]) -> Dict[str, int]:
         """Analyze common error patterns."""
-        error_counts = {}
-        for error in error_patterns:
-            error_counts[error] = error_counts.get(error, 0) + 1
-        return error_counts
+        return dict(Counter(error_patterns))
     
     def _identify_struggling_topics(self, weak_areas: List[str], time_spent: Dict[str, int]) -> List[Dict[str, Any]]:
         """Identify topics where student is struggling."""
-        struggling_topics = []
-        
-        for area in weak_areas:
-            time_invested = time_spent.get(area, 0)
-            struggling_topics.append({
-                "topic": area,
-                "time_invested": time_invested,
-                "difficulty_level": "high" if time_invested > 20 else "medium",
-                "priority": "high" if time_invested > 30 else "medium"
-            })
-        
-        return sorted(struggling_topics, key=lambda x: x["time_invested"], reverse=True)
+        if not weak_areas:
+            return []
+        
+        invested = [time_spent.get(area, 0) for area in weak_areas]
+        times = np.asarray(invested)
+        difficulty = np.where(times > 20, "high", "medium")
+        priority = np.where(times > 30, "high", "medium")
+        
+        # Most time invested first; stable so ties keep their input order
+        return [
+            {
+                "topic": weak_areas[i],
+                "time_invested": invested[i],
+                "difficulty_level": str(difficulty[i]),
+                "priority": str(priority[i])
+            }
+            for i in np.argsort(-times, kind="stable")
+        ]
     
     def _generate_interventions(self, struggling_topics: List[Dict[str, Any]], error_analysis: Dict[str, int]) -> List[Dict[str, str]]:
         """Generate intervention strategies."""
@@ -386,8 +763,9 @@ class AdvancedAnalytics:
     
     def _estimate_improvement_time(self, struggling_topics: List[Dict[str, Any]]) -> int:
         """Estimate time needed for improvement in weeks."""
-        total_time = sum(topic["time_invested"] for topic in struggling_topics)
-        return max(1, total_time // 10)  # Rough estimate
+        total_time = np.fromiter(map(itemgetter("time_invested"), struggling_topics),
+                                 dtype=np.float64, count=len(struggling_topics)).sum()
+        return max(1, int(total_time) // 10)  # Rough estimate
     
     def _get_student_data(self, student_id: str, time_period: str) -> Dict[str, Any]:
         """Get student data for analysis (mock implementation)."""
@@ -410,9 +788,9 @@ class AdvancedAnalytics:
             "time_spent_by_topic": {"algebra": 25, "geometry": 20, "arithmetic": 15}
         }
     
-    def _analyze_engagement(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_engagement(self, student_data: _StudentView) -> Dict[str, Any]:
         """Analyze student engagement patterns."""
-        engagement_score = student_data.get("engagement_score", 0)
+        engagement_score = student_data.engagement_score
         
         return {
             "overall_engagement": engagement_score,
@@ -421,12 +799,12 @@ class AdvancedAnalytics:
             "recommendations": self._get_engagement_recommendations(engagement_score)
         }
     
-    def _analyze_learning_efficiency(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_learning_efficiency(self, student_data: _StudentView) -> Dict[str, Any]:
         """Analyze learning efficiency metrics."""
-        time_per_module = student_data.get("average_time_per_module", 0)
-        completion_rate = student_data.get("completion_rate", 0)
+        time_per_module = student_data.average_time_per_module
+        completion_rate = student_data.completion_rate
         
-        efficiency_score = min(100, max(0, (completion_rate * 100) - (time_per_module * 2)))
+        efficiency_score = float(np.clip((completion_rate * 100) - (time_per_module * 2), 0.0, 100.0))
         
         return {
             "efficiency_score": efficiency_score,
@@ -436,31 +814,16 @@ class AdvancedAnalytics:
             "recommendations": self._get_efficiency_recommendations(efficiency_score, time_per_module)
         }
     
-    def _get_engagement_recommendations(self, engagement_score: float) -> List[str]:
+    @staticmethod
+    def _get_engagement_recommendations(engagement_score: float) -> Tuple[str, ...]:
         """Get engagement improvement recommendations."""
-        if engagement_score < 0.6:
-            return [
-                "Try interactive learning activities",
-                "Set up study groups with peers",
-                "Use gamification elements",
-                "Take breaks between study sessions"
-            ]
-        return ["Continue current engagement strategies"]
-    
-    def _get_efficiency_recommendations(self, efficiency_score: float, time_per_module: int) -> List[str]:
+        return _LOW_ENGAGEMENT_RECS if engagement_score < 0.6 else _STEADY_ENGAGEMENT_RECS
+    
+    @staticmethod
+    def _get_efficiency_recommendations(efficiency_score: float, time_per_module: int) -> Tuple[str, ...]:
         """Get efficiency improvement recommendations."""
-        recommendations = []
-        
-        if efficiency_score < 60:
-            recommendations.append("Focus on active learning techniques")
-        
-        if time_per_module > 15:
-            recommendations.append("Break down complex topics into smaller chunks")
-        
-        if efficiency_score > 80:
-            recommendations.append("Consider advancing to more challenging material")
-        
-        return recommendations
+        # Only the thresholds matter, so at most eight distinct results are built
+        return _efficiency_recommendations(efficiency_score < 60, time_per_module > 15, efficiency_score > 80)
     
     def _generate_comprehensive_recommendations(self, learning_style, performance_prediction, 
                                               weakness_analysis, engagement_analysis, efficiency_analysis) -> List[Dict[str, str]]:
@@ -498,6 +861,6 @@ class AdvancedAnalytics:
             insights.append("Performance improvement needed - consider additional support")
         
         if len(weakness_analysis.get("struggling_topics", [])) > 0:
-            insights.append(f"Focus areas identified: {', '.join(weakness_analysis['struggling_topics'][:3])}")
+            insights.append(f"Focus areas identified: {', '.join(t['topic'] for t in weakness_analysis['struggling_topics'][:3])}")
         
         return insights
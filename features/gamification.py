@@ -6,164 +6,207 @@ and motivation through achievements, badges, streaks, and interactive elements.
 """
 
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import bisect
+import numpy as np
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Study streak lengths (days) that are celebrated, ascending
+_STREAK_MILESTONES = (3, 7, 14, 30, 60, 100)
+_STREAK_SET = frozenset(_STREAK_MILESTONES)
+
+# Leaderboard tiers: points at which each tier after Bronze starts
+_TIER_CUTOFFS = (500, 1000, 2500, 5000)
+_TIER_NAMES = ("Bronze", "Silver", "Gold", "Platinum", "Diamond")
+
+# Students shown on a leaderboard
+_LEADERBOARD_SIZE = 50
+
+# Achievement requirement -> (source, field, default): the field is read from
+# the student's progress ("progress") or the current activity ("activity").
+# "_languages_used_count" is derived once per check by check_achievements
+_REQ_DISPATCH = {
+    "questions_asked": ("progress", "total_questions", 0),
+    "languages_used": ("progress", "_languages_used_count", 0),
+    "study_streak": ("progress", "current_streak", 0),
+    "modules_completed_daily": ("activity", "modules_completed_today", 0),
+    "students_helped": ("progress", "students_helped", 0),
+    "perfect_scores": ("progress", "perfect_scores", 0),
+    "early_study_days": ("progress", "early_study_days", 0),
+    "late_study_days": ("progress", "late_study_days", 0)
+}
+
+def _frozen(table: Dict[str, Dict[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    """Read-only view of a catalogue table, including nested requirement dicts"""
+    return MappingProxyType({
+        key: MappingProxyType({
+            field: MappingProxyType(value) if isinstance(value, dict) else value
+            for field, value in entry.items()
+        })
+        for key, entry in table.items()
+    })
+
+# Available achievements and badges; the same objects serve every engine
+_ACHIEVEMENTS: Mapping[str, Mapping[str, Any]] = _frozen({
+    "first_question": {
+        "id": "first_question",
+        "name": "First Steps",
+        "description": "Ask your first question",
+        "icon": "🌱",
+        "points": 10,
+        "category": "milestone",
+        "requirements": {"questions_asked": 1}
+    },
+    "language_explorer": {
+        "id": "language_explorer",
+        "name": "Language Explorer",
+        "description": "Use 3 different languages",
+        "icon": "🌍",
+        "points": 25,
+        "category": "exploration",
+        "requirements": {"languages_used": 3}
+    },
+    "streak_master": {
+        "id": "streak_master",
+        "name": "Streak Master",
+        "description": "Study for 7 consecutive days",
+        "icon": "🔥",
+        "points": 50,
+        "category": "consistency",
+        "requirements": {"study_streak": 7}
+    },
+    "knowledge_seeker": {
+        "id": "knowledge_seeker",
+        "name": "Knowledge Seeker",
+        "description": "Ask 100 questions",
+        "icon": "🔍",
+        "points": 100,
+        "category": "milestone",
+        "requirements": {"questions_asked": 100}
+    },
+    "multilingual_master": {
+        "id": "multilingual_master",
+        "name": "Multilingual Master",
+        "description": "Use all 6 supported languages",
+        "icon": "🗣️",
+        "points": 75,
+        "category": "achievement",
+        "requirements": {"languages_used": 6}
+    },
+    "speed_learner": {
+        "id": "speed_learner",
+        "name": "Speed Learner",
+        "description": "Complete 5 modules in one day",
+        "icon": "⚡",
+        "points": 40,
+        "category": "efficiency",
+        "requirements": {"modules_completed_daily": 5}
+    },
+    "helpful_peer": {
+        "id": "helpful_peer",
+        "name": "Helpful Peer",
+        "description": "Help 10 other students",
+        "icon": "🤝",
+        "points": 60,
+        "category": "social",
+        "requirements": {"students_helped": 10}
+    },
+    "perfect_score": {
+        "id": "perfect_score",
+        "name": "Perfect Score",
+        "description": "Get 100% on 5 assessments",
+        "icon": "💯",
+        "points": 80,
+        "category": "excellence",
+        "requirements": {"perfect_scores": 5}
+    },
+    "early_bird": {
+        "id": "early_bird",
+        "name": "Early Bird",
+        "description": "Study before 8 AM for 5 days",
+        "icon": "🐦",
+        "points": 30,
+        "category": "habit",
+        "requirements": {"early_study_days": 5}
+    },
+    "night_owl": {
+        "id": "night_owl",
+        "name": "Night Owl",
+        "description": "Study after 10 PM for 5 days",
+        "icon": "🦉",
+        "points": 30,
+        "category": "habit",
+        "requirements": {"late_study_days": 5}
+    }
+})
+
+_BADGES: Mapping[str, Mapping[str, Any]] = _frozen({
+    "bronze_learner": {
+        "id": "bronze_learner",
+        "name": "Bronze Learner",
+        "description": "Earned 100 points",
+        "icon": "🥉",
+        "points_required": 100,
+        "rarity": "common"
+    },
+    "silver_learner": {
+        "id": "silver_learner",
+        "name": "Silver Learner",
+        "description": "Earned 500 points",
+        "icon": "🥈",
+        "points_required": 500,
+        "rarity": "uncommon"
+    },
+    "gold_learner": {
+        "id": "gold_learner",
+        "name": "Gold Learner",
+        "description": "Earned 1000 points",
+        "icon": "🥇",
+        "points_required": 1000,
+        "rarity": "rare"
+    },
+    "platinum_learner": {
+        "id": "platinum_learner",
+        "name": "Platinum Learner",
+        "description": "Earned 2500 points",
+        "icon": "💎",
+        "points_required": 2500,
+        "rarity": "epic"
+    },
+    "diamond_learner": {
+        "id": "diamond_learner",
+        "name": "Diamond Learner",
+        "description": "Earned 5000 points",
+        "icon": "💠",
+        "points_required": 5000,
+        "rarity": "legendary"
+    }
+})
+
+# (badge_id, badge) from the lowest points requirement up, for check_badges
+_BADGES_SORTED = tuple(sorted(_BADGES.items(), key=lambda item: item[1]["points_required"]))
+
 class GamificationEngine:
     """
     Gamification engine that provides achievements, badges, streaks,
     and other engagement features to motivate students.
     """
     
+    # Fixed attribute set: no per-instance __dict__, and slot lookups are direct
+    __slots__ = ("achievements", "badges", "streak_tracker", "point_system", "_badges_sorted")
+    
     def __init__(self):
-        self.achievements = self._initialize_achievements()
-        self.badges = self._initialize_badges()
+        # Shared read-only catalogues, built once at import
+        self.achievements = _ACHIEVEMENTS
+        self.badges = _BADGES
+        self._badges_sorted = _BADGES_SORTED
         self.streak_tracker = {}
         self.point_system = {}
         
-    def _initialize_achievements(self) -> Dict[str, Dict[str, Any]]:
-        """Initialize available achievements."""
-        return {
-            "first_question": {
-                "id": "first_question",
-                "name": "First Steps",
-                "description": "Ask your first question",
-                "icon": "🌱",
-                "points": 10,
-                "category": "milestone",
-                "requirements": {"questions_asked": 1}
-            },
-            "language_explorer": {
-                "id": "language_explorer",
-                "name": "Language Explorer",
-                "description": "Use 3 different languages",
-                "icon": "🌍",
-                "points": 25,
-                "category": "exploration",
-                "requirements": {"languages_used": 3}
-            },
-            "streak_master": {
-                "id": "streak_master",
-                "name": "Streak Master",
-                "description": "Study for 7 consecutive days",
-                "icon": "🔥",
-                "points": 50,
-                "category": "consistency",
-                "requirements": {"study_streak": 7}
-            },
-            "knowledge_seeker": {
-                "id": "knowledge_seeker",
-                "name": "Knowledge Seeker",
-                "description": "Ask 100 questions",
-                "icon": "🔍",
-                "points": 100,
-                "category": "milestone",
-                "requirements": {"questions_asked": 100}
-            },
-            "multilingual_master": {
-                "id": "multilingual_master",
-                "name": "Multilingual Master",
-                "description": "Use all 6 supported languages",
-                "icon": "🗣️",
-                "points": 75,
-                "category": "achievement",
-                "requirements": {"languages_used": 6}
-            },
-            "speed_learner": {
-                "id": "speed_learner",
-                "name": "Speed Learner",
-                "description": "Complete 5 modules in one day",
-                "icon": "⚡",
-                "points": 40,
-                "category": "efficiency",
-                "requirements": {"modules_completed_daily": 5}
-            },
-            "helpful_peer": {
-                "id": "helpful_peer",
-                "name": "Helpful Peer",
-                "description": "Help 10 other students",
-                "icon": "🤝",
-                "points": 60,
-                "category": "social",
-                "requirements": {"students_helped": 10}
-            },
-            "perfect_score": {
-                "id": "perfect_score",
-                "name": "Perfect Score",
-                "description": "Get 100% on 5 assessments",
-                "icon": "💯",
-                "points": 80,
-                "category": "excellence",
-                "requirements": {"perfect_scores": 5}
-            },
-            "early_bird": {
-                "id": "early_bird",
-                "name": "Early Bird",
-                "description": "Study before 8 AM for 5 days",
-                "icon": "🐦",
-                "points": 30,
-                "category": "habit",
-                "requirements": {"early_study_days": 5}
-            },
-            "night_owl": {
-                "id": "night_owl",
-                "name": "Night Owl",
-                "description": "Study after 10 PM for 5 days",
-                "icon": "🦉",
-                "points": 30,
-                "category": "habit",
-                "requirements": {"late_study_days": 5}
-            }
-        }
-    
-    def _initialize_badges(self) -> Dict[str, Dict[str, Any]]:
-        """Initialize available badges."""
-        return {
-            "bronze_learner": {
-                "id": "bronze_learner",
-                "name": "Bronze Learner",
-                "description": "Earned 100 points",
-                "icon": "🥉",
-                "points_required": 100,
-                "rarity": "common"
-            },
-            "silver_learner": {
-                "id": "silver_learner",
-                "name": "Silver Learner",
-                "description": "Earned 500 points",
-                "icon": "🥈",
-                "points_required": 500,
-                "rarity": "uncommon"
-            },
-            "gold_learner": {
-                "id": "gold_learner",
-                "name": "Gold Learner",
-                "description": "Earned 1000 points",
-                "icon": "🥇",
-                "points_required": 1000,
-                "rarity": "rare"
-            },
-            "platinum_learner": {
-                "id": "platinum_learner",
-                "name": "Platinum Learner",
-                "description": "Earned 2500 points",
-                "icon": "💎",
-                "points_required": 2500,
-                "rarity": "epic"
-            },
-            "diamond_learner": {
-                "id": "diamond_learner",
-                "name": "Diamond Learner",
-                "description": "Earned 5000 points",
-                "icon": "💠",
-                "points_required": 5000,
-                "rarity": "legendary"
-            }
-        }
-    
     def check_achievements(self, student_id: str, activity_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Check if student has earned any new achievements.
@@ -178,24 +221,35 @@ class GamificationEngine:
         try:
             # Get student's current progress
             student_progress = self._get_student_progress(student_id)
+            # Measured once here rather than by every languages_used requirement
+            student_progress = {
+                **student_progress,
+                "_languages_used_count": len(student_progress.get("languages_used", ()))
+            }
             
             new_achievements = []
+            earned = set(student_progress.get("earned_achievements", ()))
+            pending = []
+            # One timestamp for everything earned in this check
+            now_iso = datetime.now().isoformat()
             
             for achievement_id, achievement in self.achievements.items():
                 # Skip if already earned
-                if achievement_id in student_progress.get("earned_achievements", []):
+                if achievement_id in earned:
                     continue
                 
                 # Check if requirements are met
                 if self._check_achievement_requirements(achievement, activity_data, student_progress):
                     new_achievements.append({
-                        "achievement": achievement,
-                        "earned_at": datetime.now().isoformat(),
+                        "achievement": dict(achievement, requirements=dict(achievement["requirements"])),
+                        "earned_at": now_iso,
                         "points_awarded": achievement["points"]
                     })
-                    
-                    # Update student progress
-                    self._update_student_progress(student_id, achievement_id, achievement["points"])
+                    pending.append((achievement_id, achievement["points"]))
+            
+            # Record everything earned in one write
+            if pending:
+                self._bulk_update_student_progress(student_id, pending)
             
             return new_achievements
             
@@ -216,24 +270,28 @@ class GamificationEngine:
         try:
             student_progress = self._get_student_progress(student_id)
             total_points = student_progress.get("total_points", 0)
-            earned_badges = student_progress.get("earned_badges", [])
+            earned_badges = set(student_progress.get("earned_badges", ()))
             
             new_badges = []
+            now_iso = datetime.now().isoformat()
             
-            for badge_id, badge in self.badges.items():
+            for badge_id, badge in self._badges_sorted:
+                # Every later badge needs at least as many points
+                if total_points < badge["points_required"]:
+                    break
+                
                 # Skip if already earned
                 if badge_id in earned_badges:
                     continue
                 
-                # Check if points requirement is met
-                if total_points >= badge["points_required"]:
-                    new_badges.append({
-                        "badge": badge,
-                        "earned_at": datetime.now().isoformat()
-                    })
-                    
-                    # Update student progress
-                    self._update_student_badges(student_id, badge_id)
+                new_badges.append({
+                    "badge": dict(badge),
+                    "earned_at": now_iso
+                })
+            
+            # Record everything earned in one write
+            if new_badges:
+                self._bulk_update_student_badges(student_id, [b["badge"]["id"] for b in new_badges])
             
             return new_badges
             
@@ -322,15 +380,24 @@ class GamificationEngine:
             # Filter by time period
             filtered_students = self._filter_by_time_period(all_students, time_period)
             
-            # Sort by points
-            leaderboard = sorted(filtered_students, key=lambda x: x.get("points", 0), reverse=True)
+            if not filtered_students:
+                return []
             
-            # Add ranking
-            for i, student in enumerate(leaderboard):
-                student["rank"] = i + 1
-                student["tier"] = self._get_student_tier(student.get("points", 0))
+            # Rank everyone on a points array, then tier only the shown rows
+            # float64: points may be fractional, and ints stay exact up to 2**53
+            points = np.fromiter((s.get("points", 0) for s in filtered_students),
+                                 dtype=np.float64, count=len(filtered_students))
+            # Highest first; mergesort is stable, so ties keep their input order
+            top = np.argsort(-points, kind="mergesort")[:_LEADERBOARD_SIZE]
             
-            return leaderboard[:50]  # Top 50
+            leaderboard = []
+            for rank, (i, student_points) in enumerate(zip(top.tolist(), points[top].tolist()), start=1):
+                student = filtered_students[i]
+                student["rank"] = rank
+                student["tier"] = self._get_student_tier(student_points)
+                leaderboard.append(student)
+            
+            return leaderboard
             
         except Exception as e:
             logger.error(f"Error generating leaderboard: {e}")
@@ -350,7 +417,9 @@ class GamificationEngine:
             Dictionary with challenge details
         """
         try:
-            challenge_id = f"challenge_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            # One clock read so the id and start date agree
+            now = datetime.now()
+            challenge_id = f"challenge_{now.strftime('%Y%m%d_%H%M%S')}"
             
             challenge = {
                 "id": challenge_id,
@@ -360,8 +429,8 @@ class GamificationEngine:
                 "duration_days": duration_days,
                 "requirements": requirements,
                 "rewards": self._get_challenge_rewards(challenge_type),
-                "start_date": datetime.now().isoformat(),
-                "end_date": (datetime.now() + timedelta(days=duration_days)).isoformat(),
+                "start_date": now.isoformat(),
+                "end_date": (now + timedelta(days=duration_days)).isoformat(),
                 "participants": [],
                 "status": "active"
             }
@@ -379,30 +448,13 @@ class GamificationEngine:
         requirements = achievement.get("requirements", {})
         
         for req_key, req_value in requirements.items():
-            if req_key == "questions_asked":
-                if student_progress.get("total_questions", 0) < req_value:
-                    return False
-            elif req_key == "languages_used":
-                if len(student_progress.get("languages_used", [])) < req_value:
-                    return False
-            elif req_key == "study_streak":
-                if student_progress.get("current_streak", 0) < req_value:
-                    return False
-            elif req_key == "modules_completed_daily":
-                if activity_data.get("modules_completed_today", 0) < req_value:
-                    return False
-            elif req_key == "students_helped":
-                if student_progress.get("students_helped", 0) < req_value:
-                    return False
-            elif req_key == "perfect_scores":
-                if student_progress.get("perfect_scores", 0) < req_value:
-                    return False
-            elif req_key == "early_study_days":
-                if student_progress.get("early_study_days", 0) < req_value:
-                    return False
-            elif req_key == "late_study_days":
-                if student_progress.get("late_study_days", 0) < req_value:
-                    return False
+            rule = _REQ_DISPATCH.get(req_key)
+            if rule is None:
+                # Unknown requirements don't block the achievement
+                continue
+            source, field, default = rule
+            if (activity_data if source == "activity" else student_progress).get(field, default) < req_value:
+                return False
         
         return True
     
@@ -423,41 +475,32 @@ class GamificationEngine:
             "late_study_days": 1
         }
     
-    def _update_student_progress(self, student_id: str, achievement_id: str, points: int):
-        """Update student progress with new achievement."""
-        # In production, this would update database
-        logger.info(f"Student {student_id} earned achievement {achievement_id} for {points} points")
+    def _bulk_update_student_progress(self, student_id: str, awards: List[Tuple[str, int]]):
+        """Update student progress with several new (achievement_id, points) awards at once."""
+        # In production, this would be one database round trip (a single
+        # multi-row insert/update), not one per achievement
+        logger.info(f"Student {student_id} earned achievements {awards} for {sum(points for _, points in awards)} points")
     
-    def _update_student_badges(self, student_id: str, badge_id: str):
-        """Update student badges."""
-        # In production, this would update database
-        logger.info(f"Student {student_id} earned badge {badge_id}")
+    def _bulk_update_student_badges(self, student_id: str, badge_ids: List[str]):
+        """Update student badges with several new badges at once."""
+        # In production, this would be one database round trip
+        logger.info(f"Student {student_id} earned badges {badge_ids}")
     
     def _check_streak_achievements(self, student_id: str, current_streak: int) -> List[Dict[str, Any]]:
         """Check for streak-related achievements."""
-        achievements = []
-        
-        streak_milestones = [3, 7, 14, 30, 60, 100]
-        
-        for milestone in streak_milestones:
-            if current_streak == milestone:
-                achievements.append({
-                    "type": "streak_milestone",
-                    "milestone": milestone,
-                    "message": f"Amazing! {milestone} day streak! 🔥"
-                })
+        if current_streak not in _STREAK_SET:
+            return []
         
-        return achievements
+        return [{
+            "type": "streak_milestone",
+            "milestone": current_streak,
+            "message": f"Amazing! {current_streak} day streak! 🔥"
+        }]
     
     def _get_next_streak_milestone(self, current_streak: int) -> Optional[int]:
         """Get next streak milestone."""
-        milestones = [3, 7, 14, 30, 60, 100]
-        
-        for milestone in milestones:
-            if current_streak < milestone:
-                return milestone
-        
-        return None
+        i = bisect.bisect_right(_STREAK_MILESTONES, current_streak)
+        return _STREAK_MILESTONES[i] if i < len(_STREAK_MILESTONES) else None
     
     def _get_all_students_data(self) -> List[Dict[str, Any]]:
         """Get all students data (mock implementation)."""
@@ -477,16 +520,8 @@ class GamificationEngine:
     
     def _get_student_tier(self, points: int) -> str:
         """Get student tier based on points."""
-        if points >= 5000:
-            return "Diamond"
-        elif points >= 2500:
-            return "Platinum"
-        elif points >= 1000:
-            return "Gold"
-        elif points >= 500:
-            return "Silver"
-        else:
-            return "Bronze"
+        # bisect_right: reaching a cutoff exactly already earns that tier
+        return _TIER_NAMES[bisect.bisect_right(_TIER_CUTOFFS, points)]
     
     def _get_challenge_name(self, challenge_type: str) -> str:
         """Get challenge name based on type."""
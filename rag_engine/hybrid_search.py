@@ -7,6 +7,8 @@ This module implements a hybrid search engine that combines:
 - Cross-encoder reranking for improved accuracy
 """
 
+import re
+import hashlib
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from sentence_transformers import SentenceTransformer, CrossEncoder
@@ -18,8 +20,22 @@ import chromadb
 from chromadb.config import Settings
 import logging
 
+from config.redis_config import cache_get, cache_set
+
 logger = logging.getLogger(__name__)
 
+# Dynamically quantized ONNX export published alongside sentence-transformers
+# models; ONNX Runtime runs it with int8 (VNNI) GEMM kernels on modern CPUs
+INT8_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Literal lookups - a "quoted phrase", a filename, or a #tag - are answered by
+# exact term overlap, so cross-encoder reranking adds CPU without changing
+# the order that matters; such queries skip it (see hybrid_search)
+LITERAL_QUERY_RE = re.compile(r'"[^"]+"|\S+\.(?:pdf|docx|txt|md)|#\w+', re.IGNORECASE)
+
+# Query embeddings are cached in Redis (as float16) for this long
+EMBEDDING_CACHE_TTL = 7 * 24 * 3600
+
 class HybridSearchEngine:
     """
     Advanced hybrid search engine that combines multiple retrieval methods
@@ -29,7 +45,9 @@ class HybridSearchEngine:
     def __init__(self, 
                  embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
                  cross_encoder_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
-                 persist_directory: str = "./chroma_store"):
+                 persist_directory: str = "./chroma_store",
+                 embedding_dtype: str = "float32",
+                 reranker_dtype: str = "float32"):
         """
         Initialize the hybrid search engine.
         
@@ -37,10 +55,14 @@ class HybridSearchEngine:
             embedding_model: HuggingFace model for embeddings
             cross_encoder_model: Cross-encoder model for reranking
             persist_directory: Directory to persist ChromaDB
+            embedding_dtype: "float32", or "int8" to run a quantized ONNX export
+            reranker_dtype: "float32", or "int8" to run the cross-encoder's quantized ONNX export
         """
         self.embedding_model = embedding_model
         self.cross_encoder_model = cross_encoder_model
         self.persist_directory = persist_directory
+        self.embedding_dtype = embedding_dtype
+        self.reranker_dtype = reranker_dtype
         
         # Initialize components
         self._setup_embeddings()
@@ -52,23 +74,39 @@ class HybridSearchEngine:
     
     def _setup_embeddings(self):
         """Setup embedding model"""
+        model_kwargs = {'device': 'cpu'}
+        if self.embedding_dtype == "int8":
+            model_kwargs.update(backend="onnx", model_kwargs={"file_name": INT8_ONNX_FILE})
         try:
             self.embeddings = HuggingFaceEmbeddings(
                 model_name=self.embedding_model,
-                model_kwargs={'device': 'cpu'},
+                model_kwargs=model_kwargs,
                 encode_kwargs={'normalize_embeddings': True}
             )
-            logger.info(f"Embeddings model loaded: {self.embedding_model}")
+            logger.info(f"Embeddings model loaded: {self.embedding_model} ({self.embedding_dtype})")
         except Exception as e:
+            if self.embedding_dtype == "int8":
+                # Needs sentence-transformers>=3.2 with optimum[onnxruntime]
+                logger.warning(f"int8 embeddings unavailable, falling back to float32: {e}")
+                self.embedding_dtype = "float32"
+                return self._setup_embeddings()
             logger.error(f"Failed to load embeddings model: {e}")
             raise
     
     def _setup_cross_encoder(self):
         """Setup cross-encoder for reranking"""
+        kwargs = {'device': 'cpu'}
+        if self.reranker_dtype == "int8":
+            kwargs.update(backend="onnx", model_kwargs={"file_name": INT8_ONNX_FILE})
         try:
-            self.cross_encoder = CrossEncoder(self.cross_encoder_model)
-            logger.info(f"Cross-encoder model loaded: {self.cross_encoder_model}")
+            self.cross_encoder = CrossEncoder(self.cross_encoder_model, **kwargs)
+            logger.info(f"Cross-encoder model loaded: {self.cross_encoder_model} ({self.reranker_dtype})")
         except Exception as e:
+            if self.reranker_dtype == "int8":
+                # ONNX cross-encoders need sentence-transformers>=4.0 with optimum[onnxruntime]
+                logger.warning(f"int8 cross-encoder unavailable, falling back to float32: {e}")
+                self.reranker_dtype = "float32"
+                return self._setup_cross_encoder()
             logger.error(f"Failed to load cross-encoder model: {e}")
             raise
     
@@ -154,7 +192,7 @@ class HybridSearchEngine:
         """
         try:
             # Generate query embedding
-            query_embedding = self.embeddings.embed_query(query)
+            query_embedding = self._embed_query(query)
             
             # Search in ChromaDB
             results = self.collection.query(
@@ -178,6 +216,25 @@ class HybridSearchEngine:
             logger.error(f"Semantic search failed: {e}")
             return []
     
+    def _embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query, reusing vectors cached in Redis for the same text.
+        
+        Keys use the lowercased, whitespace-collapsed query (the MiniLM
+        tokenizer is uncased) plus the model and dtype that produced the vector.
+        """
+        normalized = " ".join(query.lower().split())
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+        key = f"emb:{self.embedding_model}:{self.embedding_dtype}:{digest}"
+        
+        cached = cache_get(key)
+        if cached is not None:
+            return np.frombuffer(cached, dtype=np.float16).astype(np.float32).tolist()
+        
+        embedding = self.embeddings.embed_query(query)
+        cache_set(key, np.asarray(embedding, dtype=np.float16).tobytes(), EMBEDDING_CACHE_TTL)
+        return embedding
+    
     def keyword_search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
         """
         Perform keyword search using BM25-like approach.
@@ -237,8 +294,8 @@ class HybridSearchEngine:
             # Prepare query-document pairs for cross-encoder
             pairs = [(query, result['content']) for result in results]
             
-            # Get relevance scores
-            relevance_scores = self.cross_encoder.predict(pairs)
+            # Score every pair in a single forward pass
+            relevance_scores = self.cross_encoder.predict(pairs, batch_size=len(pairs))
             
             # Add scores to results
             for i, result in enumerate(results):
@@ -310,6 +367,10 @@ class HybridSearchEngine:
             final_results = list(combined_results.values())
             final_results.sort(key=lambda x: x['hybrid_score'], reverse=True)
             
+            # Literal lookups keep the hybrid order; no cross-encoder pass
+            if LITERAL_QUERY_RE.fullmatch(query.strip()):
+                return final_results[:k]
+            
             # Rerank top results
             top_results = final_results[:k*2]  # Get more for reranking
             reranked_results = self.rerank_results(query, top_results, k)
@@ -354,6 +415,7 @@ class HybridSearchEngine:
             return {
                 "total_documents": count,
                 "embedding_model": self.embedding_model,
+                "embedding_dtype": self.embedding_dtype,
                 "cross_encoder_model": self.cross_encoder_model,
                 "persist_directory": self.persist_directory
             }
@@ -11,16 +11,26 @@ This module implements:
 
 import os
 import re
-from typing import Dict, List, Optional, Tuple
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
 from langdetect import detect, DetectorFactory
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 import streamlit as st
 
+from config.redis_config import cache_get, cache_set
+
 # Set seed for consistent language detection
 DetectorFactory.seed = 0
 
+# Answers kept per engine for repeated (context, question, language) prompts
+RESPONSE_CACHE_SIZE = 128
+# How long a duplicate request waits for an identical in-flight one
+INFLIGHT_WAIT_SECONDS = 60
+
 class MultilingualRAGEngine:
     """
     Advanced multilingual RAG engine supporting 6 African languages
@@ -80,6 +90,13 @@ class MultilingualRAGEngine:
             api_key=os.getenv("GROQ_API_KEY")
         )
         
+        # LRU of generated answers keyed by a digest of the full prompt inputs.
+        # The hosted Groq API exposes no KV/prefix cache, so repeated prompts over
+        # the same retrieved context are served from here instead.
+        self._response_cache = OrderedDict()
+        self._inflight = {}
+        self._cache_lock = threading.Lock()
+        
         # Language detection patterns
         self.language_patterns = {
             "am": [r'[ሀ-፟]', r'አማርኛ', r'እንዴት', r'ምን', r'የት', r'መቼ'],
@@ -147,28 +164,145 @@ class MultilingualRAGEngine:
         
         # Get language-specific prompt
         lang_info = self.get_language_info(response_lang)
-        prompt_template = lang_info["prompt_template"]
         
-        # Create the prompt
-        prompt = ChatPromptTemplate.from_template(prompt_template)
+        cache_key = self._response_cache_key(query, context, response_lang)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
         
-        # Build the chain
-        chain = prompt | self.llm | StrOutputParser()
+        pending = self._claim_inflight(cache_key)
+        if pending is not None:
+            # An identical prompt is already in flight (e.g. from another
+            # session); share its answer instead of issuing a second request
+            pending.wait(INFLIGHT_WAIT_SECONDS)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached
         
-        # Generate response
         try:
-            response = chain.invoke({
-                "query": query,
-                "context": context,
-                "language": lang_info["native_name"],
-                "country": lang_info["country"]
-            })
+            chain, inputs = self._build_chain(query, context, lang_info)
             
-            return self._post_process_response(response, response_lang)
+            # Generate response
+            response = chain.invoke(inputs)
+            
+            response = self._post_process_response(response, response_lang)
+            self._store_cached_response(cache_key, response)
+            return response
             
         except Exception as e:
             st.error(f"Error generating multilingual response: {e}")
             return f"Sorry, I encountered an error while processing your question in {lang_info['native_name']}."
+        
+        finally:
+            if pending is None:
+                self._release_inflight(cache_key)
+    
+    def stream_multilingual_response(
+        self, 
+        query: str, 
+        context: str = "",
+        target_language: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Like generate_multilingual_response, but yield the answer in chunks
+        as the model produces them. The complete answer is cached the same way.
+        """
+        response_lang = target_language or self.detect_language(query)
+        lang_info = self.get_language_info(response_lang)
+        
+        cache_key = self._response_cache_key(query, context, response_lang)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        pending = self._claim_inflight(cache_key)
+        if pending is not None:
+            pending.wait(INFLIGHT_WAIT_SECONDS)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        try:
+            chain, inputs = self._build_chain(query, context, lang_info)
+            parts = []
+            for chunk in chain.stream(inputs):
+                # The per-language formatters work on any span of text
+                chunk = self._post_process_response(chunk, response_lang)
+                parts.append(chunk)
+                yield chunk
+            self._store_cached_response(cache_key, "".join(parts))
+            
+        except Exception as e:
+            st.error(f"Error generating multilingual response: {e}")
+            yield f"Sorry, I encountered an error while processing your question in {lang_info['native_name']}."
+        
+        finally:
+            if pending is None:
+                self._release_inflight(cache_key)
+    
+    def _build_chain(self, query: str, context: str, lang_info: Dict):
+        """Prompt | LLM | parser chain for a language, and the inputs to run it with"""
+        prompt = ChatPromptTemplate.from_template(lang_info["prompt_template"])
+        chain = prompt | self.llm | StrOutputParser()
+        inputs = {
+            "query": query,
+            "context": context,
+            "language": lang_info["native_name"],
+            "country": lang_info["country"]
+        }
+        return chain, inputs
+    
+    def _claim_inflight(self, key: bytes) -> Optional[threading.Event]:
+        """Register this caller as the generator for key; returns the event to wait on if one already is"""
+        with self._cache_lock:
+            event = self._inflight.get(key)
+            if event is None:
+                self._inflight[key] = threading.Event()
+            return event
+    
+    def _release_inflight(self, key: bytes):
+        """Wake callers waiting on key once its answer is cached (or failed)"""
+        with self._cache_lock:
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+    
+    def _response_cache_key(self, query: str, context: str, language: str) -> bytes:
+        """Digest of everything that determines the generated answer"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.llm.model_name, language, context, query):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.digest()
+    
+    def _get_cached_response(self, key: bytes) -> Optional[str]:
+        """Return a cached answer from the local LRU, then from Redis (shared across processes)"""
+        with self._cache_lock:
+            response = self._response_cache.get(key)
+            if response is not None:
+                self._response_cache.move_to_end(key)
+                return response
+        shared = cache_get(f"ans:{key.hex()}")
+        if shared is None:
+            return None
+        response = shared.decode("utf-8")
+        self._remember_response(key, response)
+        return response
+    
+    def _store_cached_response(self, key: bytes, response: str):
+        """Cache a successful answer locally and in Redis"""
+        self._remember_response(key, response)
+        cache_set(f"ans:{key.hex()}", response)
+    
+    def _remember_response(self, key: bytes, response: str):
+        """Insert an answer into the local LRU, evicting the least recently used entry when full"""
+        with self._cache_lock:
+            self._response_cache[key] = response
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
     
     def _post_process_response(self, response: str, language: str) -> str:
         """Post-process response for language-specific formatting"""